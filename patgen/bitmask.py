@@ -0,0 +1,49 @@
+'''
+Created on Oct 18, 2026
+'''
+
+
+def to_mask(positions):
+    '''
+    Packs a set of small non-negative integers into an integer bitmask
+    '''
+    mask = 0
+    for i in positions:
+        mask |= 1 << i
+    return mask
+
+
+def iter_bits(mask):
+    '''
+    Yields indices of set bits, in increasing order
+    '''
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def to_set(mask):
+    return set(iter_bits(mask))
+
+
+def weighted_sum(mask, weights):
+    '''
+    Sums weights[i] over indices of set bits
+    '''
+    total = 0
+    while mask:
+        low = mask & -mask
+        total += weights[low.bit_length() - 1]
+        mask ^= low
+    return total
+
+
+def margin_mask(length, margins):
+    '''
+    Bitmask of hyphen indices of a word of :length: letters that honor hyphenation margins
+    '''
+    right = length - margins.right
+    if right < margins.left:
+        return 0
+    return (1 << (right + 1)) - (1 << margins.left)
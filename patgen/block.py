@@ -0,0 +1,50 @@
+'''
+Created on Oct 18, 2026
+'''
+import marshal
+import zlib
+
+
+def encode_block(records):
+    '''
+    Serializes dictionary records (word, hyphens, missed, false, weights) into a compact block of bytes.
+    Hyphens, missed and false positions are bitmasks (see Dictionary.mask_records).
+
+    Words are stored as a single newline-delimited string, and weights as a single default value per word (or a full tuple if word
+    weights are not uniform).
+    '''
+    words = []
+    hyphens = []
+    missed = []
+    false = []
+    weights = []
+
+    for word, h, m, f, w in records:
+        words.append(word)
+        hyphens.append(h)
+        missed.append(m)
+        false.append(f)
+
+        wt = tuple(w[i] for i in range(len(word) + 1))
+        if all(x == wt[0] for x in wt):
+            weights.append(wt[0])
+        else:
+            weights.append(wt)
+
+    data = ('\n'.join(words), hyphens, missed, false, weights)
+    return zlib.compress(marshal.dumps(data))
+
+
+def decode_block(block):
+    '''
+    Reverses encode_block. Yields (word, hyphens, missed, false, weights) records, weights
+    as a tuple indexed by position
+    '''
+    text, hyphens, missed, false, weights = marshal.loads(zlib.decompress(block))
+    if not hyphens:
+        return
+
+    for word, h, m, f, w in zip(text.split('\n'), hyphens, missed, false, weights):
+        if type(w) is int:
+            w = (w,) * (len(word) + 1)
+        yield word, h, m, f, w
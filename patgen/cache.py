@@ -0,0 +1,56 @@
+'''
+Created on Oct 18, 2026
+'''
+import collections
+
+
+class WordCache:
+    ''' Bounded LRU cache of hyphenation results.
+
+    Cache is bound to the state of a pattern set (see PatternSet.layers_key) and drops all
+    entries when that state changes.
+    '''
+
+    def __init__(self, maxsize):
+        if maxsize <= 0:
+            raise ValueError('cache size must be positive, got: %s' % maxsize)
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._owner_key = None
+
+    def __len__(self):
+        return len(self._data)
+
+    def validate(self, owner_key):
+        '''
+        Drops all cached entries if pattern set state has changed since they were computed
+        '''
+        if owner_key != self._owner_key:
+            self._data.clear()
+            self._owner_key = owner_key
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._data[key] = self._data.pop(key)  # move to the most recently used end
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return '<WordCache size=%s/%s, hits=%s, misses=%s>' % (len(self._data), self.maxsize, self.hits, self.misses)
@@ -0,0 +1,307 @@
+'''
+Created on Oct 18, 2026
+'''
+from array import array
+from patgen.dictionary import Dictionary, MaskView
+from patgen.bitmask import to_mask, to_set, iter_bits
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+MAXLEN = 63  # longest word that fits in a 64-bit position mask
+
+
+class CompactDictionary(Dictionary):
+    ''' Hyphenation dictionary with compact, array-backed storage.
+
+    Words are encoded with a per-dictionary alphabet into one contiguous array of letter
+    codes (plus array of word offsets). Hyphens, missed and false positions are stored
+    as per-word 64-bit masks, weights as a per-word default value plus sparse overrides.
+
+    Mapping API of Dictionary (keys(), items(), missed, false, weights) is available as views.
+    '''
+
+    def __init__(self):
+        self._alphabet = {}
+        self._letters = []
+        self._text = array('H')
+        self._offsets = array('L', [0])
+        self._hyphens = array('Q')
+        self._missed = array('Q')
+        self._false = array('Q')
+        self._default_weight = array('B')
+        self._weight_overrides = {}
+        self._order = array('L')  # word ids sorted by encoded word (None if needs to be re-built)
+        self._recent = {}  # words added after _order was built
+        self._totals = None  # running totals of weighted missed and false hyphens
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_order'] = None
+        state['_recent'] = {}
+        state.pop('_changes', None)
+        return state
+
+    def __setstate__(self, state):
+        self._totals = None
+        self.__dict__.update(state)
+
+    def __len__(self):
+        return len(self._hyphens)
+
+    def __contains__(self, word):
+        return self._lookup(word) is not None
+
+    def _encode(self, word):
+        alphabet = self._alphabet
+        for c in word:
+            if c not in alphabet:
+                alphabet[c] = len(self._letters)
+                self._letters.append(c)
+        return array('H', [alphabet[c] for c in word])
+
+    def _word(self, i):
+        letters = self._letters
+        return ''.join(letters[c] for c in self._text[self._offsets[i]:self._offsets[i+1]])
+
+    def _codes(self, i):
+        return self._text[self._offsets[i]:self._offsets[i+1]]
+
+    def _word_weights(self, i, length):
+        weights = dict.fromkeys(range(length + 1), self._default_weight[i])
+        weights.update(self._weight_overrides.get(i, ()))
+        return weights
+
+    def _fold(self):
+        self._order = array('L', sorted(range(len(self)), key=self._codes))
+        self._recent = {}
+
+    def _lookup(self, word, fold=True):
+        if self._order is None or (fold and self._recent):
+            self._fold()
+
+        i = self._recent.get(word)
+        if i is not None or not self._order:
+            return i
+
+        codes = array('H')
+        for c in word:
+            code = self._alphabet.get(c)
+            if code is None:
+                return None
+            codes.append(code)
+
+        lo, hi = 0, len(self._order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._codes(self._order[mid]) < codes:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._order) and self._codes(self._order[lo]) == codes:
+            return self._order[lo]
+        return None
+
+    def _id(self, word):
+        i = self._lookup(word)
+        if i is None:
+            raise KeyError(word)
+        return i
+
+    def add(self, word, hyphens, missed, false, weights):
+        self.add_masks(word, to_mask(hyphens), to_mask(missed), to_mask(false), weights)
+
+    def add_masks(self, word, hyphens, missed, false, weights=None):
+        if len(word) > MAXLEN:
+            raise ValueError('word is too long for compact dictionary (max %s letters): %s' % (MAXLEN, word))
+
+        i = self._lookup(word, fold=False)
+        if i is None:
+            i = len(self)
+            self._text.extend(self._encode(word))
+            self._offsets.append(len(self._text))
+            self._hyphens.append(0)
+            self._missed.append(0)
+            self._false.append(0)
+            self._default_weight.append(0)
+            self._recent[word] = i
+
+        self._totals = None
+        self._stats = None
+        self._hyphens[i] = hyphens
+        self._missed[i] = missed
+        self._false[i] = false
+        if weights is None:
+            self._default_weight[i] = 1
+            self._weight_overrides.pop(i, None)
+        else:
+            self._set_weights(i, weights)
+
+    def _set_weights(self, i, weights):
+        default = weights[0]
+        self._default_weight[i] = default
+        overrides = dict((k, v) for k, v in weights.items() if v != default)
+        if overrides:
+            self._weight_overrides[i] = overrides
+        else:
+            self._weight_overrides.pop(i, None)
+
+    @property
+    def weights(self):
+        return _WeightsView(self)
+
+    @property
+    def missed(self):
+        return MaskView(self, self._missed)
+
+    @property
+    def false(self):
+        return MaskView(self, self._false)
+
+    def __getitem__(self, key):
+        return to_set(self._hyphens[self._id(key)])
+
+    def keys(self):
+        return _KeysView(self)
+
+    def items(self):
+        for i in range(len(self)):
+            yield self._word(i), to_set(self._hyphens[i])
+
+    def values(self):
+        for mask in self._hyphens:
+            yield to_set(mask)
+
+    def mask_items(self):
+        for i in range(len(self)):
+            yield self._word(i), self._hyphens[i]
+
+    def mask_records(self):
+        for i in range(len(self)):
+            word = self._word(i)
+            yield word, self._hyphens[i], self._missed[i], self._false[i], self._word_weights(i, len(word))
+
+    def compute_total_hyphens(self):
+        if self._stats is not None:
+            return self._stats[0]
+        return sum(bin(mask).count('1') for mask in self._hyphens)
+
+    def make_all_missed(self):
+        self._missed[:] = self._hyphens
+        self._false[:] = array('Q', [0]) * len(self)
+        self._totals = None
+        if self._changes is not None:
+            self._changes.update(range(len(self)))
+
+    def changed_errors(self):
+        return dict((i, (self._missed[i], self._false[i])) for i in sorted(self._changes or ()))
+
+    def weighted_errors(self, word):
+        i = self._id(word)
+        return self._weighted_sum(i, self._missed[i]), self._weighted_sum(i, self._false[i])
+
+    def error_totals(self):
+        if self._totals is None:
+            num_missed = 0
+            num_false = 0
+            for i in range(len(self)):
+                num_missed += self._weighted_sum(i, self._missed[i])
+                num_false += self._weighted_sum(i, self._false[i])
+            self._totals = num_missed, num_false
+
+        return self._totals
+
+    def update_error_masks(self, func, word_ids=None, commit=True):
+        incremental = word_ids is not None
+        if incremental:
+            num_missed, num_false = self.error_totals()
+        else:
+            word_ids = range(len(self))
+            num_missed, num_false = 0, 0
+
+        hyphens = self._hyphens
+        missed_masks = self._missed
+        false_masks = self._false
+        changes = self._changes if commit else None
+
+        for i in word_ids:
+            old_missed = missed_masks[i]
+            old_false = false_masks[i]
+
+            missed, false = func(i, self._word(i), hyphens[i], old_missed, old_false)
+            if incremental and missed == old_missed and false == old_false:
+                continue
+
+            if incremental:
+                num_missed -= self._weighted_sum(i, old_missed)
+                num_false -= self._weighted_sum(i, old_false)
+            num_missed += self._weighted_sum(i, missed)
+            num_false += self._weighted_sum(i, false)
+
+            if commit:
+                if changes is not None and (missed != old_missed or false != old_false):
+                    changes.add(i)
+                missed_masks[i] = missed
+                false_masks[i] = false
+
+        if commit:
+            self._totals = num_missed, num_false
+        return num_missed, num_false
+
+    def _weighted_sum(self, i, mask):
+        if not mask:
+            return 0
+        overrides = self._weight_overrides.get(i)
+        if not overrides:
+            return self._default_weight[i] * bin(mask).count('1')
+        default = self._default_weight[i]
+        return sum(overrides.get(index, default) for index in iter_bits(mask))
+
+    @classmethod
+    def from_batches(cls, batches, jobs=1):
+        dictionary = super(CompactDictionary, cls).from_batches(batches, jobs=jobs)
+        dictionary._fold()
+        return dictionary
+
+    @classmethod
+    def from_dictionary(cls, dictionary):
+        compact = cls()
+        for record in dictionary.records():
+            compact.add(*record)
+        compact._fold()
+        return compact
+
+
+class _KeysView:
+
+    def __init__(self, dictionary):
+        self._dictionary = dictionary
+
+    def __len__(self):
+        return len(self._dictionary)
+
+    def __iter__(self):
+        for i in range(len(self._dictionary)):
+            yield self._dictionary._word(i)
+
+    def __contains__(self, word):
+        return word in self._dictionary
+
+
+class _WeightsView(Mapping):
+
+    def __init__(self, dictionary):
+        self._dictionary = dictionary
+
+    def __getitem__(self, word):
+        i = self._dictionary._id(word)
+        return self._dictionary._word_weights(i, len(word))
+
+    def __iter__(self):
+        return iter(self._dictionary.keys())
+
+    def __len__(self):
+        return len(self._dictionary)
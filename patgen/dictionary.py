@@ -5,22 +5,60 @@ Created on Mar 7, 2016
 '''
 import collections
 import codecs
+import gc
+import itertools
+import re
 from patgen import FALSE_HYPHEN, MISSED_HYPHEN, TRUE_HYPHEN, DIGITS
 from patgen.margins import Margins
 from patgen.chunker import Chunker
+from patgen.statistics import collect_statistics
+from patgen import statistics
+from patgen.block import encode_block
+from patgen.bitmask import to_mask, to_set, iter_bits, weighted_sum
+from patgen import parallel
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
 
 
 class Dictionary:
     ''' Hyphenation dictionary.
     Holds set of allowed hyphenation positions for each word.
     Additionally, can store hyphenation errors (missed and false) and hyphenation weights
+
+    Positions are stored as integer bitmasks (see patgen.bitmask). Mapping API (dictionary[word],
+    items(), missed, false) returns sets built from the masks, training and evaluation work on masks 
+    directly. Missed and false views return frozensets: to change errors of a word, assign a new set
+    (dictionary.missed[word] = positions) or use update_errors.
     '''
     
+    _changes = None  # ids of words with changed errors (see track_changes)
+    _stats = None  # (total hyphens, margins) computed while loading, reset when words are added
+    _words = None  # words by id (see _word_list), reset when words are added
+
     def __init__(self):
-        self._hyphens = collections.OrderedDict()
+        self._hyphens = collections.OrderedDict()  # word -> bitmask
         self._weights = {}
         self._missed = {}
         self._false = {}
+        self._totals = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('_changes', None)
+        state.pop('_words', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in ('_hyphens', '_missed', '_false'):
+            masks = getattr(self, name)
+            if masks and not all(type(mask) is int for mask in masks.values()):
+                # older projects stored positions as sets
+                for word, positions in masks.items():
+                    masks[word] = to_mask(positions)
 
     @property
     def weights(self):
@@ -28,78 +66,253 @@ class Dictionary:
     
     @property
     def missed(self):
-        return self._missed
+        return MaskView(self, self._missed)
 
     @property
     def false(self):
-        return self._false
+        return MaskView(self, self._false)
+
+    def __len__(self):
+        return len(self._hyphens)
 
     def __getitem__(self, key):
-        return self._hyphens[key]
-    
-    def __setitems__(self, key, val):
-        self._hyphens[key] = val
+        return to_set(self._hyphens[key])
     
+    def _id(self, word):
+        '''
+        Key of word in internal storage (see MaskView)
+        '''
+        if word not in self._hyphens:
+            raise KeyError(word)
+        return word
+
+    def _word_list(self):
+        '''
+        Returns list of words indexed by word id. Built once and kept until a new word is added
+        '''
+        if self._words is None:
+            self._words = list(self._hyphens.keys())
+        return self._words
+
     def keys(self):
         return self._hyphens.keys()
     
+    def __setitems__(self, key, val):
+        self._words = None
+        self._hyphens[key] = to_mask(val)
+    
     def items(self):
-        return self._hyphens.items()
+        for word, mask in self._hyphens.items():
+            yield word, to_set(mask)
     
     def values(self):
-        return self._hyphens.values()
+        for mask in self._hyphens.values():
+            yield to_set(mask)
     
+    def mask_items(self):
+        '''
+        Yields (word, hyphens) with hyphens as a bitmask
+        '''
+        return iter(self._hyphens.items())
+
     def compute_total_hyphens(self):
-        return sum(len(h) for h in self.values())
+        if self._stats is not None:
+            return self._stats[0]
+        return sum(bin(mask).count('1') for _, mask in self.mask_items())
 
     def compute_margins(self):
+        if self._stats is not None:
+            return self._stats[1]
         margin_left = 1000
         margin_right = 1000
-        for word, hyphen in self.items():
-            if hyphen:
-                hmin = min(hyphen)
-                hmax = max(hyphen)
-                margin_left = min(margin_left, hmin)
-                margin_right = min(margin_right, len(word) - hmax)
+        for word, mask in self.mask_items():
+            if mask:
+                margin_left = min(margin_left, (mask & -mask).bit_length() - 1)
+                margin_right = min(margin_right, len(word) - mask.bit_length() + 1)
 
         return Margins(margin_left, margin_right)
 
+    def add(self, word, hyphens, missed, false, weights):
+        self.add_masks(word, to_mask(hyphens), to_mask(missed), to_mask(false), weights)
+
+    def add_masks(self, word, hyphens, missed, false, weights=None):
+        '''
+        Same as add, but positions are bitmasks. If :weights: is None, all weights are 1
+        '''
+        if weights is None:
+            weights = dict.fromkeys(range(len(word) + 1), 1)
+        if word not in self._hyphens:
+            self._words = None
+        self._hyphens[word] = hyphens
+        self._weights[word] = weights
+        self._missed[word] = missed
+        self._false[word] = false
+        self._totals = None
+        self._stats = None
+
+    def weighted_errors(self, word):
+        weights = self._weights[word]
+        return weighted_sum(self._missed[word], weights), weighted_sum(self._false[word], weights)
+
+    def error_totals(self):
+        '''
+        Returns weighted totals of missed and false hyphens. Totals are computed once, and then
+        kept up to date by update_errors.
+        '''
+        if getattr(self, '_totals', None) is None:
+            num_missed = 0
+            num_false  = 0
+            for word in self.keys():
+                m, f = self.weighted_errors(word)
+                num_missed += m
+                num_false  += f
+            self._totals = num_missed, num_false
+
+        return self._totals
+
+    def update_errors(self, func, word_ids=None, commit=True):
+        '''
+        Replaces missed and false sets of words with the result of 
+        func(word_id, word, hyphens, missed, false) -> (missed, false).
+        
+        If :word_ids: is None, all words are updated. Otherwise, only words with 
+        given ids (positions in dictionary order) are updated, and running totals 
+        are adjusted accordingly.
+
+        If :commit: is False, dictionary is not changed (only totals are computed).
+
+        Returns weighted totals of missed and false hyphens in the whole dictionary.
+        '''
+        def update(word_id, word, hyphens, missed, false):
+            missed, false = func(word_id, word, to_set(hyphens), to_set(missed), to_set(false))
+            return to_mask(missed), to_mask(false)
+
+        return self.update_error_masks(update, word_ids=word_ids, commit=commit)
+
+    def update_error_masks(self, func, word_ids=None, commit=True):
+        '''
+        Same as update_errors, but func receives and returns bitmasks
+        '''
+        incremental = word_ids is not None
+        if incremental:
+            num_missed, num_false = self.error_totals()
+        else:
+            word_ids = range(len(self))
+            num_missed, num_false = 0, 0
+
+        hyphens = self._hyphens
+        missed_masks = self._missed
+        false_masks = self._false
+        changes = self._changes if commit else None
+
+        words = self._word_list()
+        for word_id in word_ids:
+            word = words[word_id]
+            old_missed = missed_masks[word]
+            old_false = false_masks[word]
+
+            missed, false = func(word_id, word, hyphens[word], old_missed, old_false)
+            if incremental and missed == old_missed and false == old_false:
+                continue
+
+            weights = self._weights[word]
+            if incremental:
+                num_missed -= weighted_sum(old_missed, weights)
+                num_false  -= weighted_sum(old_false, weights)
+            num_missed += weighted_sum(missed, weights)
+            num_false  += weighted_sum(false, weights)
+
+            if commit:
+                if changes is not None and (missed != old_missed or false != old_false):
+                    changes.add(word_id)
+                missed_masks[word] = missed
+                false_masks[word] = false
+        
+        if commit:
+            self._totals = num_missed, num_false
+        return num_missed, num_false
+
     def make_all_missed(self):
-        for word in self.keys():
-            self.missed[word].clear()
-            self.missed[word].update(self[word])  # all hyphens are initially missing
-            self.false[word].clear()
+        self._missed = dict(self._hyphens)  # all hyphens are initially missing
+        self._false = dict.fromkeys(self._hyphens, 0)
+        self._totals = None
+        if self._changes is not None:
+            self._changes.update(range(len(self)))
+
+    def track_changes(self):
+        '''
+        Starts recording ids of words whose missed or false hyphens are changed (see changed_errors)
+        '''
+        self._changes = set()
+
+    def changed_errors(self):
+        '''
+        Returns {word_id: (missed, false)} of words changed since track_changes was called.
+        Missed and false hyphens are returned as bitmasks.
+        '''
+        words = self._word_list()
+        return dict((i, (self._missed[words[i]], self._false[words[i]])) for i in sorted(self._changes or ()))
+
+    def set_errors(self, errors):
+        '''
+        Sets missed and false hyphens of words from the result of changed_errors
+        '''
+        self.update_error_masks(lambda word_id, word, hyphens, missed, false: errors[word_id], word_ids=sorted(errors))
 
     @classmethod
-    def load(cls, filename):
+    def load(cls, filename, jobs=1):
+        '''
+        Reads dictionary file in large blocks. If jobs > 1, blocks are parsed by a pool of processes
+        '''
+        from patgen import mapped_dictionary
+        from patgen.hyphenator import read_batches
+        if mapped_dictionary.is_store(filename):
+            return mapped_dictionary.MappedDictionary(filename)
 
-        with codecs.open(filename, 'r', 'utf-8') as f:
-            return cls.from_string(f.read())
+        with open(filename, 'rb') as f:
+            return cls.from_batches(read_batches(f, LOAD_BATCH_SIZE), jobs=jobs)
     
     @classmethod
     def from_string(cls, string):
+        return cls.from_batches([string.split('\n')])
+
+    @classmethod
+    def from_batches(cls, batches, jobs=1):
+        '''
+        Builds dictionary from batches of text lines, parsed by parse_dictionary_lines (in a pool of
+        :jobs: processes, if jobs > 1). Total number of hyphens and margins are computed on the way
+        '''
         dictionary = cls()
-        for line in string.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith('#'):  # comment line
-                continue
 
-            text, hyphens, missed, false, weight = parse_dictionary_word(line)
-            dictionary._hyphens[text] = hyphens
-            dictionary._weights[text] = weight
-            dictionary._missed[text] = missed
-            dictionary._false[text] = false
+        num_records = 0
+        total_hyphens = 0
+        margin_left = 1000
+        margin_right = 1000
 
+        enabled = gc.isenabled()
+        gc.disable()  # bulk load creates millions of containers and no reference cycles
+        try:
+            for records, hyphens, left, right in parallel.imap_bounded(parse_dictionary_lines, batches, jobs=jobs):
+                add = dictionary.add_masks
+                for record in records:
+                    add(*record)
+                num_records += len(records)
+                total_hyphens += hyphens
+                margin_left = min(margin_left, left)
+                margin_right = min(margin_right, right)
+        finally:
+            if enabled:
+                gc.enable()
+
+        if num_records == len(dictionary):  # otherwise, duplicate words replaced earlier ones
+            dictionary._stats = total_hyphens, Margins(margin_left, margin_right)
         return dictionary
-    
+
     def save(self, filename):
 
         with codecs.open(filename, 'w', 'utf-8') as f:
             
-            for word, hyphens in self._hyphens.items():
-                w = self._weights[word]
+            for word, hyphens, _, _, w in self.records():
                 
                 f.write(format_dictionary_word(word, hyphens, w))
                 f.write('\n')
@@ -115,24 +328,20 @@ class Dictionary:
         good = collections.defaultdict(int)
         bad  = collections.defaultdict(int)
     
-        for word in self.keys():
-            hyphens = self[word]
-            missed  = self.missed[word]
-            false   = self.false[word]
-            weight  = self.weights[word]
-    
+        for word, hyphens, missed, false, weight in self.mask_records():
             for start, ch in chunker(word, hyphenpos=hyphen_position):
                 index = start + hyphen_position - 1
-                w     = weight[start + hyphen_position - 1]
+                w     = weight[index]
+                bit   = 1 << index
                 if not inhibiting:
-                    if index in missed:
+                    if missed & bit:
                         good[ch] += w
-                    elif index not in hyphens:
+                    elif not hyphens & bit:
                         bad[ch] += w
                 else:
-                    if index in  false:
+                    if false & bit:
                         good[ch] += w
-                    elif index in hyphens and index not in missed:
+                    elif hyphens & ~missed & bit:
                         bad[ch] += w
         
         ##print('.x', len([x for x in sorted(set(good.keys()) | set(bad.keys())) if x.startswith('.') ]))
@@ -140,6 +349,126 @@ class Dictionary:
     
         return [(ch, good[ch], bad[ch]) for ch in sorted(set(good.keys()) | set(bad.keys()))]
 
+    def records(self):
+        for word, hyphens, missed, false, weights in self.mask_records():
+            yield word, to_set(hyphens), to_set(missed), to_set(false), weights
+
+    def mask_records(self):
+        '''
+        Yields (word, hyphens, missed, false, weights) records with positions as bitmasks
+        '''
+        for word, hyphens in self._hyphens.items():
+            yield word, hyphens, self._missed[word], self._false[word], self._weights[word]
+
+    def collect_pattern_statistics(self, inhibiting, patt_len, margins, shards=1, jobs=1):
+        '''
+        Same as generate_pattern_statistics, but computes statistics for all hyphen positions
+        at once, making a single pass over the dictionary.
+        
+        If shards > 1, dictionary is split into that many word shards that are counted 
+        in a pool of :jobs: processes, and the results are summed up.
+
+        Returns PatternStatistics object.
+        '''
+        if shards > 1:
+            return parallel.collect_sharded_statistics(list(self.shards(shards)), inhibiting, patt_len, margins, jobs=jobs)
+
+        return collect_statistics(self.mask_records(), inhibiting, patt_len, margins)
+
+    def shards(self, num_shards):
+        '''
+        Splits dictionary into :num_shards: contiguous word ranges and yields each
+        as a compact serialized block (see patgen.block)
+        '''
+        size = (len(self) + num_shards - 1) // num_shards or 1
+
+        records = self.mask_records()
+        for _ in range(0, len(self), size):
+            yield encode_block(itertools.islice(records, size))
+
+
+class MaskView(MutableMapping):
+    ''' Mapping of word to a set of positions, backed by per-word bitmasks.
+
+    Values are frozensets built from the masks: assign a new set to change positions of a word
+    (in-place updates like view[word].add(i) are not possible).
+    '''
+
+    def __init__(self, dictionary, masks):
+        self._dictionary = dictionary
+        self._masks = masks
+
+    def __getitem__(self, word):
+        return frozenset(iter_bits(self._masks[self._dictionary._id(word)]))
+
+    def __setitem__(self, word, positions):
+        self._masks[self._dictionary._id(word)] = to_mask(positions)
+        self._dictionary._totals = None
+
+    def __delitem__(self, word):
+        raise TypeError('can not delete words from dictionary')
+
+    def __iter__(self):
+        return iter(self._dictionary.keys())
+
+    def __len__(self):
+        return len(self._dictionary)
+
+
+LOAD_BATCH_SIZE = 20000  # lines parsed at once (by a worker process, if parsing in parallel)
+
+_SPECIAL = re.compile('[%s%s%s]' % (re.escape(MISSED_HYPHEN), re.escape(FALSE_HYPHEN), DIGITS))
+
+
+def parse_dictionary_lines(lines):
+    '''
+    Parses a batch of dictionary lines, skipping empty and comment lines.
+
+    Returns (records, total hyphens, left margin, right margin), where records is a list of
+    (word, hyphens, missed, false, weights) with positions as bitmasks (see Dictionary.add_masks).
+    Weights is None when all weights of a word are 1.
+    '''
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        search = _SPECIAL.search
+        records = []
+        total_hyphens = 0
+        margin_left = 1000
+        margin_right = 1000
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):  # empty or comment line
+                continue
+
+            if search(line):
+                word, hyphens, missed, false, weights = parse_dictionary_word(line)
+                hyphens = to_mask(hyphens)
+                if any(w != 1 for w in weights.values()):
+                    records.append((word, hyphens, to_mask(missed), to_mask(false), weights))
+                else:
+                    records.append((word, hyphens, to_mask(missed), to_mask(false), None))
+            else:
+                # plain word with true hyphens only
+                parts = line.split(TRUE_HYPHEN)
+                hyphens = 0
+                index = 0
+                for part in parts[:-1]:
+                    index += len(part)
+                    hyphens |= 1 << index
+                word = ''.join(parts).lower()
+                records.append((word, hyphens, 0, 0, None))
+
+            if hyphens:
+                total_hyphens += bin(hyphens).count('1')
+                margin_left = min(margin_left, (hyphens & -hyphens).bit_length() - 1)
+                margin_right = min(margin_right, len(word) - hyphens.bit_length() + 1)
+
+        return records, total_hyphens, margin_left, margin_right
+    finally:
+        if enabled:
+            gc.enable()
+
 
 def parse_dictionary_word(word):
 
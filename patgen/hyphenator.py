@@ -0,0 +1,106 @@
+'''
+Created on Oct 18, 2026
+
+Streaming hyphenation of large word lists.
+'''
+import codecs
+from patgen.dictionary import format_dictionary_word
+from patgen import parallel
+
+
+CHUNK_SIZE = 1 << 20  # bytes read from input at once
+
+# per-process state, set up once by the pool initializer
+_worker = {}
+
+
+def read_batches(f, batch_size, chunk_size=CHUNK_SIZE):
+    '''
+    Reads UTF-8 encoded word list from binary file :f: in large chunks.
+
+    Lines are split and stripped the same way codecs.open(...).readline() does it, empty lines are skipped.
+    Yields lists of at most :batch_size: words.
+    '''
+    decoder = codecs.getincrementaldecoder('utf-8')()
+
+    batch = []
+    tail = ''
+    while True:
+        data = f.read(chunk_size)
+        lines = (tail + decoder.decode(data, final=not data)).splitlines(True)
+
+        tail = ''
+        if data and lines and len(lines[-1].splitlines()[0]) == len(lines[-1]):
+            tail = lines.pop()  # incomplete line, wait for the rest of it
+
+        for line in lines:
+            word = line.strip()
+            if word:
+                batch.append(word)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+        if not data:
+            break
+
+    if batch:
+        yield batch
+
+
+def init_hyphenation(patternset, margins, engine='automaton', cache_size=0):
+    patternset.set_cache_size(cache_size)
+    _worker['patternset'] = patternset
+    _worker['margins'] = margins
+    _worker['engine'] = engine
+
+
+def hyphenate_words(words):
+    '''
+    Returns list of hyphenated words, formatted as dictionary words
+    '''
+    patternset = _worker['patternset']
+    margins = _worker['margins']
+    engine = _worker['engine']
+
+    return [format_dictionary_word(word, patternset.hyphenate(word, margins=margins, engine=engine)) for word in words]
+
+
+def hyphenate_batch(words):
+    '''
+    Hyphenates a batch of words.
+
+    Returns (UTF-8 encoded output lines, number of words, cache hits, cache misses)
+    '''
+    cache = _worker['patternset'].cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+    text = ''.join(line + '\n' for line in hyphenate_words(words))
+
+    if cache is not None:
+        hits, misses = cache.hits - hits, cache.misses - misses
+
+    return text.encode('utf-8'), len(words), hits, misses
+
+
+def hyphenate_stream(patternset, margins, infile, outfile, jobs=1, batch_size=10000, engine='automaton', cache_size=0):
+    '''
+    Hyphenates word list from binary file :infile: and writes result to binary file :outfile:,
+    in input order. Batches of words are hyphenated by a pool of :jobs: processes, each holding
+    its own copy of the pattern set. Only a few batches per process are kept in memory at any time.
+
+    Returns (number of words, cache hits, cache misses)
+    '''
+    num_words = 0
+    num_hits = 0
+    num_misses = 0
+
+    results = parallel.imap_bounded(hyphenate_batch, read_batches(infile, batch_size), jobs=jobs,
+                                    initializer=init_hyphenation, initargs=(patternset, margins, engine, cache_size))
+    for data, count, hits, misses in results:
+        outfile.write(data)
+        num_words += count
+        num_hits += hits
+        num_misses += misses
+
+    return num_words, num_hits, num_misses
@@ -0,0 +1,57 @@
+'''
+Created on Oct 18, 2026
+
+Changes of a pattern set between two project commits (see Project.commit).
+'''
+from patgen.bitmask import iter_bits
+
+
+def snapshot(patternset):
+    '''
+    Remembers current state of all layers
+    '''
+    return [(layer, dict(layer.masks())) for layer in patternset]
+
+
+def patternset_changes(base, patternset):
+    '''
+    Compares pattern set with its :base: snapshot.
+
+    Returns (number of layers, changes), where changes is a list of (level0, kind, data):
+        ('layer', layer)       - layer was added or replaced
+        ('patterns', masks)    - patterns of a layer were changed, masks maps pattern key to its new bitmask
+                                 (0 if pattern was removed)
+    '''
+    changes = []
+    for level0, layer in enumerate(patternset):
+        if level0 >= len(base) or base[level0][0] is not layer:
+            changes.append((level0, 'layer', layer))
+            continue
+
+        old = base[level0][1]
+        new = layer.masks()
+        masks = dict((key, mask) for key, mask in new.items() if old.get(key) != mask)
+        masks.update((key, 0) for key in old if key not in new)
+        if masks:
+            changes.append((level0, 'patterns', masks))
+
+    return len(patternset), changes
+
+
+def apply_patternset_changes(patternset, changes):
+    '''
+    Reverses patternset_changes
+    '''
+    num_layers, changes = changes
+    del patternset[num_layers:]
+
+    for level0, kind, data in changes:
+        if kind == 'layer':
+            if level0 < len(patternset):
+                patternset[level0] = data
+            else:
+                patternset.append(data)
+        else:
+            layer = patternset[level0]
+            for key, mask in data.items():
+                layer[key] = iter_bits(mask)
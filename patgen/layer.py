@@ -3,11 +3,17 @@ Created on Mar 7, 2016
 
 @author: mike
 '''
-import collections
-from patgen import EMPTYSET
+from patgen.bitmask import to_mask, to_set, iter_bits, margin_mask
 
 
 class Layer:
+    ''' Patterns of a single hyphenation level.
+
+    Maps pattern key to the set of hyphen positions it controls. Positions are stored as
+    integer bitmasks (see patgen.bitmask), keys with no positions are not stored.
+    '''
+
+    _version = 0  # incremented on every change (see PatternSet.layers_key)
     
     @property
     def maxchunk(self):
@@ -18,13 +24,33 @@ class Layer:
         self.selector = selector
         self.inhibiting = inhibiting
         
-        self._data = collections.defaultdict(set)
-    
-    def __getitem__(self, i):
-        return self._data[i]
-    
-    def get(self, i, defaultval=None):
-        return self._data.get(i, defaultval)
+        self._data = {}  # key -> bitmask of positions
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._data and not all(type(mask) is int for mask in self._data.values()):
+            # older projects stored positions as (default)dict of sets
+            self._data = dict((key, to_mask(positions)) for key, positions in self._data.items() if positions)
+    
+    def __getitem__(self, key):
+        return to_set(self._data[key])
+
+    def __setitem__(self, key, positions):
+        mask = to_mask(positions)
+        if mask:
+            self._data[key] = mask
+        else:
+            self._data.pop(key, None)
+        self._version += 1
+
+    def __contains__(self, key):
+        return key in self._data
+    
+    def get(self, key, defaultval=None):
+        mask = self._data.get(key)
+        if mask is None:
+            return defaultval
+        return to_set(mask)
 
     def __len__(self):
         return len(self._data)
@@ -33,30 +59,32 @@ class Layer:
         return self._data.keys()
     
     def items(self):
-        return self._data.items()
+        for key, mask in self._data.items():
+            yield key, to_set(mask)
     
     def values(self):
-        return self._data.values()
+        for mask in self._data.values():
+            yield to_set(mask)
+
+    def masks(self):
+        '''
+        Returns a mapping of pattern key to the bitmask of its positions. Do not modify it.
+        '''
+        return self._data
     
     def update(self, vals):
-        self._data.update(vals)
+        for key, positions in vals.items():
+            self[key] = positions
     
     def __repr__(self):
-        return '<Layer patlen_range=%r, selector=%r, data=%r>' % (self.patlen_range, self.selector, self._data)
+        return '<Layer patlen_range=%r, selector=%r, data=%r>' % (self.patlen_range, self.selector, dict(self.items()))
     
     def compute_num_patterns(self):
-        return sum(len(val) for val in self.values())
+        return sum(bin(mask).count('1') for mask in self._data.values())
 
     def train(self, patlen, dictionary, margins):
-        patterns = collections.defaultdict(set)
-        for position in range(0, patlen+1):
-            for ch, num_good, num_bad in dictionary.generate_pattern_statistics(
-                                                                            self.inhibiting, 
-                                                                            patlen, 
-                                                                            position, 
-                                                                            margins=margins):
-                    if self.selector.select(num_good, num_bad):
-                        patterns[ch].add(position)
+        stats = dictionary.collect_pattern_statistics(self.inhibiting, patlen, margins=margins)
+        patterns = stats.select(self.selector)
 
         self.update(patterns)
         return patterns
@@ -69,19 +97,25 @@ class Layer:
         For hyphenation patternsets, these are indices where hyphenation is predicted.
         For inhibiting patternsets, these are indices where hyphenation is inhibited.
         '''
+        return to_set(self.predict_mask(word, margins))
+
+    def predict_mask(self, word, margins):
+        '''
+        Same as predict, but returns a bitmask of predicted indices
+        '''
+        data = self._data
+        length = len(word)
         word = '.' + word + '.'
     
-        prediction = set()
-    
-        for chunklen in range(1, self.maxchunk+1):
+        # bit (start + index) of the accumulator is hyphen index (start + index - 1)
+        prediction = 0
+        for chunklen in range(1, min(self.maxchunk, len(word)) + 1):
             for start in range(0, len(word) - chunklen + 1):
-                ch = word[start: start+chunklen]
-                allowed = self._data.get(ch, EMPTYSET)
-                for index in allowed:
-                    if start + index > margins.left and start+index <= len(word) - 1 - margins.right:
-                        prediction.add(index + start - 1)  # -1 corrects for the added front padding
+                mask = data.get(word[start: start+chunklen])
+                if mask:
+                    prediction |= mask << start
     
-        return prediction
+        return (prediction >> 1) & margin_mask(length, margins)
 
     def predict_explain(self, word, margins, explain):
         '''
@@ -98,8 +132,7 @@ class Layer:
         for chunklen in range(1, self.maxchunk+1):
             for start in range(0, len(word) - chunklen + 1):
                 ch = word[start: start+chunklen]
-                allowed = self._data.get(ch, EMPTYSET)
-                for index in allowed:
+                for index in iter_bits(self._data.get(ch, 0)):
                     if start + index > margins.left and start+index <= len(word) - 1 - margins.right:
                         explain('pattern "%s" ("%s") hit offset %s' % (ch, ch.encode('unicode-escape').decode('ascii'), index+start-1))
                         explain.flush()
@@ -107,25 +140,35 @@ class Layer:
     
         return prediction
 
-    def apply_to_dictionary(self, inhibiting, dictionary, margins):
-        num_missed = 0
-        num_false  = 0
-    
-        for word, hyphens in dictionary.items():
-            predicted = self.predict(word, margins=margins)
-            
-            missed = dictionary.missed[word]
-            false  = dictionary.false[word]
-            weights = dictionary.weights[word]
+    def apply_to_dictionary(self, inhibiting, dictionary, margins, index=None, commit=True):
+        '''
+        Updates missed and false hyphens of dictionary words with this layer's predictions.
+
+        If NgramIndex :index: is given, occurrences of layer patterns are looked up in the index, 
+        and only words that contain them are updated.
+
+        If :commit: is False, dictionary is left unchanged.
+        
+        Returns weighted totals of missed and false hyphens.
+        '''
+        if index is not None and index.covers(self):
+            predictions = index.predict_masks(self, margins)
+            word_ids = sorted(predictions.keys())
+            predict = lambda word_id, word: predictions[word_id]
+        else:
+            word_ids = None
+            predict = lambda word_id, word: self.predict_mask(word, margins)
+
+        def update(word_id, word, hyphens, missed, false):
+            predicted = predict(word_id, word)
     
             if not inhibiting:
-                missed.difference_update(predicted)
-                false.update(predicted - hyphens)
+                missed = missed & ~predicted
+                false  = false | (predicted & ~hyphens)
             else:
-                false.difference_update(predicted)
-                missed.update(hyphens & (predicted - missed))
-    
-            num_missed += sum(weights[i] for i in missed)
-            num_false += sum(weights[i] for i in false)
-        
-        return num_missed, num_false
+                false  = false & ~predicted
+                missed = missed | (hyphens & predicted)
+            
+            return missed, false
+
+        return dictionary.update_error_masks(update, word_ids=word_ids, commit=commit)
@@ -8,15 +8,22 @@ from __future__ import print_function
 import os
 import codecs
 import sys
+import time
 from patgen.margins import Margins
 from patgen.dictionary import Dictionary, format_dictionary_word,\
     format_word_as_pattern
+from patgen.compact_dictionary import CompactDictionary
+from patgen.mapped_dictionary import MappedDictionary
 from patgen.project import Project
 from patgen.selector import Selector
 from patgen.range import Range
 from patgen.version import __version__
 from patgen.patternset import PatternSet
 from patgen.layer import Layer
+from patgen import statistics
+from patgen import parallel
+from patgen.hyphenator import hyphenate_stream
+from patgen.runtime import write_runtime
 
 
 def main_new(args):
@@ -30,7 +37,14 @@ def main_new(args):
         print('Dictionary file not found', args.dictionary)
         return -1
     
-    dictionary = Dictionary.load(args.dictionary)
+    if args.compact:
+        dictionary = CompactDictionary.load(args.dictionary, jobs=args.jobs)
+    else:
+        dictionary = Dictionary.load(args.dictionary, jobs=args.jobs)
+
+    if args.store:
+        print('Writing dictionary store', args.store)
+        dictionary = MappedDictionary.from_dictionary(dictionary, args.store)
 
     if args.margins is None:
         print('Automatically computing hyphenation margins from dictionary')
@@ -41,6 +55,12 @@ def main_new(args):
     project = Project(dictionary, margins)
     project.save(args.project)
 
+    if args.index:
+        print('Building n-gram index of chunks up to length', args.index)
+        project.build_index(args.index)
+        project.save_index(args.project)
+        print('\tindexed chunks:', len(project.index))
+
     return main_show(args)
 
 
@@ -56,7 +76,7 @@ def main_show(args):
     print('\tcreated:', project.created)
     print('\tlast modified:', project.modified)
     print('\tmargins:', project.margins)
-    print('\tdictionary size:', len(project.dictionary.keys()))
+    print('\tdictionary size:', project.dictionary_size)
     #if project.ignore_weights:
     #    print('\tdictionary weights were ignored (-i flag active)')
     print('\ttotal hyphens: (weighted)', project.total_hyphens)
@@ -71,6 +91,49 @@ def main_show(args):
             print((i+1), 'INHIBITING patternset, num patterns:', len(layer))
         print('\tTrained with: range %r, selector %r' % (layer.patlen_range, layer.selector))
 
+    if project.journal:
+        print('Journal (use "consolidate" command to fold it into the project):')
+        for i, (modified, missed, false, _, num_layers, description) in enumerate(project.journal):
+            print('\t%d. %s: %s (levels: %s, missed: %s, false: %s)' % (i+1, modified, description, num_layers, missed, false))
+
+    print()
+    return 0
+
+
+def main_consolidate(args):
+    print('Consolidating journal of project', args.project)
+
+    project = Project.load(args.project)
+    num_records = len(project.journal)
+    project.save(args.project)
+
+    print('...Folded %s journal record(s) into the project' % num_records)
+    print()
+    return 0
+
+
+def main_rollback(args):
+    project = Project.load(args.project)
+    journal = project.journal
+
+    num_records = args.records
+    if args.level is not None:
+        num_records = 0
+        while num_records < len(journal) and journal[len(journal) - num_records - 1][4] > args.level:
+            num_records += 1
+
+    if num_records > len(journal):
+        print('ERROR: project journal has only %s record(s)' % len(journal))
+        return -1
+
+    print('Rolling back %s journal record(s) of project' % num_records, args.project)
+    for modified, _, _, _, _, description in journal[len(journal) - num_records:]:
+        print('\t%s: %s' % (modified, description))
+
+    Project.rollback(args.project, num_records)
+
+    project = Project.load(args.project)
+    print('Project has now %s levels, missed: %s, false: %s' % (len(project.patternset), project.missed, project.false))
     print()
     return 0
 
@@ -79,6 +142,22 @@ def main_train(args):
     print('Training project', args.project, 'using range', args.range, 'and selector', args.selector)
     
     project = Project.load(args.project)
+    if project.load_index(args.project):
+        print('Using n-gram index of chunks up to length', project.index.maxlen)
+
+    do_train(project, args)
+
+    if args.commit:
+        project.commit(args.project, 'train level %s' % len(project.patternset))
+        print('...Committed!')
+    else:
+        print('...Projects NOT changed (use --commit flag to save changes)')
+
+    print()
+    return 0
+
+
+def do_train(project, args):
 
     if len(project.patternset) & 1:
         print('Training INHIBINTING pattern layer (level=%s)' % (len(project.patternset)+1))
@@ -90,21 +169,80 @@ def main_train(args):
 
     print('\tpattern lengths:', patlen_rng)
     print('\tselector:', args.selector)
+    backend = statistics.set_backend(args.backend)
+    if backend != args.backend:
+        print('\tWARNING: %s statistics backend is not available, using %s' % (args.backend, backend))
+    if args.jobs > 1:
+        print('\tjobs:', args.jobs)
+    if args.shards > 1:
+        print('\tdictionary shards:', args.shards)
     
     total_hyphens = project.total_hyphens
 
-    project.train_new_layer(patlen_rng, selector)
+    project.train_new_layer(patlen_rng, selector, jobs=args.jobs, shards=args.shards)
 
     missed, false = project.missed, project.false
 
     print('Missed (weighted):', missed, percent(missed, total_hyphens))
     print('False (weighted):', false, percent(false, total_hyphens))
 
+    return missed, false
+
+
+def main_sweep(args):
+    print('Sweeping selectors for project', args.project, 'using range', args.range)
+
+    project = Project.load(args.project)
+    if project.load_index(args.project):
+        print('Using n-gram index of chunks up to length', project.index.maxlen)
+
+    selectors = [Selector.parse(x) for x in args.selector or []]
+    for grid in args.grid or []:
+        selectors.extend(Selector.parse_grid(grid))
+
+    if not selectors:
+        print('ERROR: no selectors given. Use --selector and/or --grid')
+        return -1
+
+    if len(project.patternset) & 1:
+        print('Sweeping INHIBINTING pattern layer (level=%s)' % (len(project.patternset)+1))
+    else:
+        print('Sweeping HYPHENATION pattern layer (level=%s)' % (len(project.patternset)+1))
+    
+    patlen_rng = Range.parse(args.range)
+    backend = statistics.set_backend(args.backend)
+    if backend != args.backend:
+        print('\tWARNING: %s statistics backend is not available, using %s' % (args.backend, backend))
+
+    print('\tpattern lengths:', patlen_rng)
+    print('\tnumber of selectors:', len(selectors))
+
+    total_hyphens = project.total_hyphens
+
+    candidates = project.sweep(patlen_rng, selectors, jobs=args.jobs)
+
+    print()
+    print('%-20s %10s %20s %20s' % ('selector', 'patterns', 'missed (weighted)', 'false (weighted)'))
+    for layer, missed, false in candidates:
+        print('%-20r %10d %10d %9s %10d %9s' % (layer.selector, layer.compute_num_patterns(), 
+                                               missed, percent(missed, total_hyphens), 
+                                               false, percent(false, total_hyphens)))
+    print()
+
     if args.commit:
-        project.save(args.project)
-        print('...Committed!')
+        chosen = Selector.parse(args.commit)
+        for layer, missed, false in candidates:
+            if layer.selector == chosen:
+                break
+        else:
+            print('ERROR: selector %r was not among the swept ones' % (chosen,))
+            return -1
+
+        project.add_layer(layer)
+        project.commit(args.project, 'sweep: level %s with selector %r' % (len(project.patternset), layer.selector))
+        print('...Committed layer trained with selector', chosen)
     else:
-        print('...Projects NOT changed (use --commit flag to save changes)')
+        print('...Project NOT changed (use --commit SELECTOR to save one of the layers)')
 
     print()
     return 0
@@ -116,18 +254,87 @@ def main_batchtrain(args):
     with codecs.open(args.specs, 'r', 'utf-8') as f:
         l = {}
         exec(f.read(), {}, l)
-        batches = l['SPECS']
 
-    for params in batches:
+    project = Project.load(args.project)
+    if project.load_index(args.project):
+        print('Using n-gram index of chunks up to length', project.index.maxlen)
+    print()
+
+    if 'CANDIDATES' in l:
+        return do_search(project, l['CANDIDATES'], args)
+
+    batches = l['SPECS']
+
+    timing = []
+    for i, params in enumerate(batches):
         args.range = params['range']
         args.selector = params['selector']
-        args.commit = True
         
-        rc = main_train(args)
-        if rc:
-            print('Error:', rc)
-            return rc
+        start = time.time()
+        do_train(project, args)
+        timing.append(time.time() - start)
+        print()
+
+        if args.checkpoint and (i + 1) % args.checkpoint == 0 and i + 1 < len(batches):
+            project.commit(args.project, 'batchtrain checkpoint: level %s' % len(project.patternset))
+            print('...Checkpoint saved (level=%s)' % len(project.patternset))
+            print()
+
+    project.commit(args.project, 'batchtrain: level %s' % len(project.patternset))
+    print('...Committed!')
+    print()
+
+    print('Training time:')
+    for level0, elapsed in zip(range(len(project.patternset) - len(timing), len(project.patternset)), timing):
+        print('\tLevel %s: %8.2f sec' % (level0 + 1, elapsed))
+    print('\tTotal  : %8.2f sec' % sum(timing))
+
+    print()
+    return 0
+
+
+def do_search(project, candidates, args):
+    
+    if isinstance(candidates, dict):
+        candidates = list(candidates.items())
+    else:
+        candidates = [('candidate-%s' % (i+1), specs) for i, specs in enumerate(candidates)]
+
+    print('Searching %s candidate SPECS using %s job(s)' % (len(candidates), args.jobs))
+    backend = statistics.set_backend(args.backend)
+    if backend != args.backend:
+        print('\tWARNING: %s statistics backend is not available, using %s' % (args.backend, backend))
+
+    total_hyphens = project.total_hyphens
+
+    results = []
+    for name, missed, false, layers, elapsed in parallel.search_candidates(project, candidates, jobs=args.jobs):
+        num_patterns = sum(layer.compute_num_patterns() for layer in layers)
+        print('\t%s: missed %s, false %s, patterns %s (%.2f sec)' % (name, missed, false, num_patterns, elapsed))
+        results.append((missed + false, num_patterns, name, missed, false, layers))
     
+    results.sort(key=lambda x: x[:2])
+
+    print()
+    print('Ranking (by weighted missed + false, then by number of patterns):')
+    print('%4s %-20s %20s %20s %10s' % ('rank', 'candidate', 'missed (weighted)', 'false (weighted)', 'patterns'))
+    for rank, (_, num_patterns, name, missed, false, _) in enumerate(results):
+        print('%4d %-20s %10d %9s %10d %9s %10d' % (rank+1, name, 
+                                                   missed, percent(missed, total_hyphens), 
+                                                   false, percent(false, total_hyphens), 
+                                                   num_patterns))
+    print()
+
+    if args.commit_best and results:
+        name, layers = results[0][2], results[0][5]
+        for layer in layers:
+            project.add_layer(layer)
+        project.commit(args.project, 'batchtrain: candidate %s' % name)
+        print('...Committed best candidate', name)
+    else:
+        print('...Project NOT changed (use --commit-best flag to save the best candidate)')
+
+    print()
     return 0
 
 
@@ -140,39 +347,61 @@ def main_export(args):
     
     project = Project.load(args.project)
 
-    pattern_strings = list(project.patternset.pattern_strings())
-    exceptions = list(project.patternset.errors(project.dictionary, project.margins))
-
-    with codecs.open(args.output, 'w', 'utf-8') as f:
+    # patterns and exceptions are written to all requested files in one pass
+    outputs = []
+    try:
+        f = codecs.open(args.output, 'w', 'utf-8')
+        outputs.append(f)
+        patterns_file = codecs.open(args.patterns, 'w', 'utf-8') if args.patterns else None
+        outputs.append(patterns_file)
+        exceptions_file = codecs.open(args.exceptions, 'w', 'utf-8') if args.exceptions else None
+        outputs.append(exceptions_file)
+
+        num_patterns = 0
         f.write('\\patterns{\n')
-        for patt in pattern_strings:
+        for patt in project.patternset.pattern_strings():
             f.write(patt + '\n')
+            if patterns_file:
+                patterns_file.write(patt + '\n')
+            num_patterns += 1
         f.write('}\n')
-        f.write('\\hyphenation{\n')
-        for word, hyphens, _, _ in exceptions:
+
+        num_exceptions = [0]  # a list, so that the sink can update it
+        exceptions = []  # (word, hyphens), collected only for the runtime file
+        def write_exception(word, hyphens, missed, false):
             text = format_dictionary_word(word, hyphens)
             f.write(text + '\n')
+            if exceptions_file:
+                exceptions_file.write(text + '\n')
+            num_exceptions[0] += 1
+            if args.runtime:
+                exceptions.append((word, hyphens))
+
+        f.write('\\hyphenation{\n')
+        project.patternset.evaluate(project.dictionary, project.margins, jobs=args.jobs, sinks=[write_exception])
         f.write('}\n')
+    finally:
+        for out in outputs:
+            if out:
+                out.close()
     
     print('Created TeX patterns file', args.output)
-    print('Number of patterns:', len(pattern_strings))
-    print('Number of exceptions:', len(exceptions))
+    print('Number of patterns:', num_patterns)
+    print('Number of exceptions:', num_exceptions[0])
 
     if args.patterns:
         print()
-        with codecs.open(args.patterns, 'w', 'utf-8') as f:
-            for patt in pattern_strings:
-                f.write(patt + '\n')
         print('Written raw patterns to', args.patterns)
 
     if args.exceptions:
         print()
-        with codecs.open(args.exceptions, 'w', 'utf-8') as f:
-            for word, hyphens, _, _ in exceptions:
-                text = format_dictionary_word(word, hyphens)
-                f.write(text + '\n')
         print('Written raw exceptions to', args.exceptions)
 
+    if args.runtime:
+        print()
+        write_runtime(args.runtime, project.patternset.table(), project.margins, exceptions)
+        print('Written runtime pattern file to', args.runtime)
+
     print()
     return 0
 
@@ -180,20 +409,36 @@ def main_hyphenate(args):
     print('Hyphenating', args.input, 'into', args.output, 'using project', args.project)
     
     project = Project.load(args.project)
+    sys.stdout.flush()
 
-    with codecs.open(args.input or sys.stdin.fileno(), 'r', 'utf-8') as f:
-        with codecs.open(args.output or sys.stdout.fileno(), 'w', 'utf-8') as out:
+    with open(args.input or sys.stdin.fileno(), 'rb') as f:
+        with open(args.output or sys.stdout.fileno(), 'wb') as out:
+            _, hits, misses = hyphenate_stream(project.patternset, project.margins, f, out, 
+                                               jobs=args.jobs, batch_size=args.batch_size, 
+                                               engine=args.engine, cache_size=args.cache_size)
 
-            for word in f:
-                word = word.strip()
-                if not word:
-                    continue
-    
-                prediction = project.patternset.hyphenate(word, margins=project.margins) 
+    if args.cache_size:
+        print('Word cache: %s hits, %s misses' % (hits, misses))
+
+    print()
+    return 0
+
+
+def main_serve(args):
+    from patgen import server  # requires asyncio (Python 3)
+
+    print('Serving hyphenation using project', args.project)
+
+    project = Project.load(args.project)
+
+    report = server.serve(project.patternset, project.margins, host=args.host, port=args.port, path=args.socket,
+                          jobs=args.jobs, batch_size=args.batch_size, batch_delay=args.batch_delay / 1000.0,
+                          engine=args.engine, cache_size=args.cache_size)
+
+    print()
+    for name, value in report.items():
+        print('\t%s: %s' % (name, value))
 
-                s = format_dictionary_word(word, prediction)
-                out.write(s + '\n')
-    
     print()
     return 0
 
@@ -245,23 +490,41 @@ def main_test(args):
     print('Testing', args.project, 'on dictionary', args.dictionary)
     project = Project.load(args.project)
 
-    dictionary = Dictionary.load(args.dictionary)
-
-    print('Performance of', args.project, 'on', args.dictionary)
-    do_test(project, dictionary)
+    dictionary = Dictionary.load(args.dictionary, jobs=args.jobs)
+    if args.cache:
+        load_predictions(project, args.project)
+
+    # totals, errors and error patterns are computed in one pass
+    outputs = []
+    sinks = []
+    try:
+        if args.errors:
+            errors_file = codecs.open(args.errors, 'w', 'utf-8')
+            outputs.append(errors_file)
+            sinks.append(lambda word, hyphens, missed, false: 
+                         errors_file.write(format_dictionary_word(word, hyphens, missed, false) + '\n'))
+
+        if args.patterns:
+            patterns_file = codecs.open(args.patterns, 'w', 'utf-8')
+            outputs.append(patterns_file)
+            sinks.append(lambda word, hyphens, missed, false: 
+                         patterns_file.write(format_word_as_pattern(word, missed, false) + '\n'))
+
+        print('Performance of', args.project, 'on', args.dictionary)
+        do_test(project, dictionary, engine=args.engine, jobs=args.jobs, sinks=sinks)
+    finally:
+        for out in outputs:
+            out.close()
 
     if args.errors:
-        with codecs.open(args.errors, 'w', 'utf-8') as f:
-            for word, hyphens, missed, false in project.patternset.errors(dictionary, project.margins):
-                f.write(format_dictionary_word(word, hyphens, missed, false) + '\n')
         print('Saved errors to', args.errors)
 
     if args.patterns:
-        with codecs.open(args.patterns, 'w', 'utf-8') as f:
-            for word, hyphens, missed, false in project.patternset.errors(dictionary, project.margins):
-                f.write(format_word_as_pattern(word, missed, false) + '\n')
         print('Saved errors to', args.patterns)
 
+    if args.cache:
+        save_predictions(project, args.project, project.patternset)
+
     print()
     return 0
 
@@ -274,18 +537,28 @@ def main_swap(args):
     
     if len(project.patternset) != len(project2.patternset):
         raise ValueError('You can only swap layers between projects with same number of layers!')
+
+    if args.cache:
+        load_predictions(project, args.project)
+        load_predictions(project2, args.project2)
+    layers, layers2 = list(project.patternset), list(project2.patternset)
     
     for i in range(1, len(project.patternset), 2):
         project.patternset[i], project2.patternset[i] = project2.patternset[i], project.patternset[i]
 
     print('Performance of', args.project)
-    project.missed, project.false = do_test(project, project.dictionary)
+    project.missed, project.false = do_test(project, project.dictionary, jobs=args.jobs)
     print('Performance of', args.project2)
-    project2.missed, project2.false = do_test(project2, project2.dictionary)
+    project2.missed, project2.false = do_test(project2, project2.dictionary, jobs=args.jobs)
+
+    if args.cache:
+        # keep predictions of both original and swapped layers
+        save_predictions(project, args.project, layers + list(project.patternset))
+        save_predictions(project2, args.project2, layers2 + list(project2.patternset))
     
     if args.commit:
-        project.save(args.project)
-        project2.save(args.project2)
+        project.commit(args.project, 'swap with %s' % args.project2)
+        project2.commit(args.project2, 'swap with %s' % args.project)
         print('...Committed')
     else:
         print('...Projects NOT changed (use --commit flag to save changes)')
@@ -297,6 +570,8 @@ def main_swap(args):
 def main_compact(args):
     print('Compacting hyphenation patterns for', args.project)
     project = Project.load(args.project)
+    if args.cache:
+        load_predictions(project, args.project)
 
     before_compact = [layer.compute_num_patterns() for layer in project.patternset]
     
@@ -307,9 +582,16 @@ def main_compact(args):
     print('Result:')
     for level0, (before, after) in enumerate(zip(before_compact, after_compact)):
         print('\tLevel %s: %6d => %6d' % (level0+1, before, after))
+
+    if args.check:
+        print('Performance after compaction')
+        do_test(project, project.dictionary, jobs=args.jobs)
+
+    if args.cache:
+        save_predictions(project, args.project, project.patternset)
     
     if args.commit:
-        project.save(args.project)
+        project.commit(args.project, 'compact')
         print('...Committed')
     else:
         print('...Project NOT changed (use --commit flag to save changes)')
@@ -318,11 +600,22 @@ def main_compact(args):
     return 0
 
 
-def do_test(project, dictionary):
+def load_predictions(project, filename):
+    num_layers = project.load_predictions(filename)
+    print('Using prediction cache with', num_layers, 'cached layers')
+
+
+def save_predictions(project, filename, layers):
+    project.predictions.retain(layers, project.margins)
+    project.save_predictions(filename)
+    print('Saved prediction cache with', len(project.predictions), 'layers')
+
+
+def do_test(project, dictionary, engine='automaton', jobs=1, sinks=()):
 
     total_hyphens = dictionary.compute_total_hyphens()
 
-    num_missed, num_false = project.patternset.evaluate(dictionary, project.margins)
+    num_missed, num_false = project.evaluate(dictionary, engine=engine, jobs=jobs, sinks=sinks)
 
     print('Missed (weighted):', num_missed, '(%4.3f%%)' % (num_missed * 100 / (total_hyphens + 0.000001)))
     print('False (weighted):', num_false,   '(%4.3f%%)' % (num_false * 100 / (total_hyphens + 0.000001)))
@@ -373,10 +666,10 @@ def main_import(args):
     else:
         print('WARNING: patterns file is empty!')
 
-    project.missed, project.false = do_test(project, project.dictionary)
+    project.missed, project.false = do_test(project, project.dictionary, jobs=args.jobs)
 
     if args.commit:
-        project.save(args.project)
+        project.commit(args.project, 'import %s' % args.input)
         print('...Committed')
     else:
         print('...Project NOT changed (use --commit flag to save changes)')
@@ -396,6 +689,10 @@ def main():
     parser_new = sub.add_parser('new', help='Creates new hyphenation pattern project from dictionary')
     parser_new.add_argument('dictionary', help='Dictionary of hyphenated words (one word per line)')
     parser_new.add_argument('-m', '--margins', help='Hyphenation margins. If not set, will  be computed from the dictionary')
+    parser_new.add_argument('-x', '--index', default=0, type=int, help='If set, builds n-gram index of dictionary chunks up to this length, and stores it alongside the project. Index speeds up updating dictionary errors after every trained layer')
+    parser_new.add_argument('--compact', default=False, action='store_true', help='Store dictionary in a compact (array-backed) form. Uses much less memory for large dictionaries')
+    parser_new.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used to parse the dictionary (default: 1)')
+    parser_new.add_argument('--store', help='Convert dictionary to a memory-mapped columnar store file and use it as project dictionary. Project refers to the store file, which must be kept alongside it. Dictionary argument can also be an existing store file')
     
     # "show" command
     parser_show = sub.add_parser('show', help='Displays information about current hyphenation project')  # @UnusedVariable
@@ -405,21 +702,63 @@ def main():
     parser_train.add_argument('-s', '--selector', default='1:5:10', help='triplet of numbers that control pattern selection. Format is: "good_weight:bad_weight:threshold"')
     parser_train.add_argument('-r', '--range', default='1,5', help='range of patterns lengths. Default is 1,5')
     parser_train.add_argument('-c', '--commit', default=False, action='store_true', help='If set, project is modified')
+    parser_train.add_argument('-j', '--jobs', default=1, type=int, help='Number of worker processes used for training. Default is 1')
+    parser_train.add_argument('--shards', default=1, type=int, help='Number of word shards to split dictionary into when computing pattern statistics. Default is 1')
+    parser_train.add_argument('--backend', default='python', choices=statistics.BACKENDS, help='Implementation of pattern statistics. "numpy" requires NumPy to be installed. Default is "python"')
+
+    # "sweep" command
+    parser_sweep = sub.add_parser('sweep', help='Trains next level with many selectors at once and reports their performance')
+    parser_sweep.add_argument('-s', '--selector', action='append', help='selector to evaluate (can be repeated). Format is: "good_weight:bad_weight:threshold"')
+    parser_sweep.add_argument('-g', '--grid', action='append', help='grid of selectors to evaluate (can be repeated). Format is: "good_weights:bad_weights:thresholds", where each part is a comma-separated list, e.g. "1:1,2,4:5,10"')
+    parser_sweep.add_argument('-r', '--range', default='1-5', help='range of patterns lengths. Default is 1-5')
+    parser_sweep.add_argument('-j', '--jobs', default=1, type=int, help='Number of worker processes. Default is 1')
+    parser_sweep.add_argument('--backend', default='python', choices=statistics.BACKENDS, help='Implementation of pattern statistics. "numpy" requires NumPy to be installed. Default is "python"')
+    parser_sweep.add_argument('-c', '--commit', default=None, help='Selector of the layer to add to the project')
 
     # "batchtrain" command
     parser_batchtrain = sub.add_parser('batchtrain', help='Trains all levels from batch specs')
     parser_batchtrain.add_argument('specs', help='file with batch training parameters specifications')
+    parser_batchtrain.add_argument('-j', '--jobs', default=1, type=int, help='Number of worker processes used for training. Default is 1')
+    parser_batchtrain.add_argument('--shards', default=1, type=int, help='Number of word shards to split dictionary into when computing pattern statistics. Default is 1')
+    parser_batchtrain.add_argument('--backend', default='python', choices=statistics.BACKENDS, help='Implementation of pattern statistics. "numpy" requires NumPy to be installed. Default is "python"')
+    parser_batchtrain.add_argument('--checkpoint', default=0, type=int, help='If set, saves project after every CHECKPOINT levels. By default, project is saved only once, after all levels are trained')
+    parser_batchtrain.add_argument('--commit-best', default=False, action='store_true', help='If specs file defines CANDIDATES, adds layers of the best candidate to the project')
+
+    # "consolidate" command
+    sub.add_parser('consolidate', help='Folds journal of committed changes into the project file')
+
+    # "rollback" command
+    parser_rollback = sub.add_parser('rollback', help='Reverts last committed changes (journal records) of the project')
+    parser_rollback.add_argument('-n', '--records', default=1, type=int, help='Number of journal records to drop. Default is 1')
+    parser_rollback.add_argument('-l', '--level', default=None, type=int, help='If set, drops journal records until project has at most this many levels')
 
     # "export" command
     parser_export = sub.add_parser('export', help='Exports project as a set of TeX patterns')
     parser_export.add_argument('output', help='Name of the TeX pattern file to create')
     parser_export.add_argument('-p', '--patterns', help='Optional file to write raw hyphenation patterns')
     parser_export.add_argument('-e', '--exceptions', help='Optional file to write raw exceptions')
+    parser_export.add_argument('-r', '--runtime', help='Optional file to write compact binary runtime patterns (see patgen.runtime)')
+    parser_export.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used to evaluate patterns (default: 1)')
 
     # "hyphenate" command
     parser_hyphenate = sub.add_parser('hyphenate', help='Hyphenates a list of words')
     parser_hyphenate.add_argument('-i', '--input', default=None, help='Input file with word list - one word per line. If not given, reads stdin.')
     parser_hyphenate.add_argument('-o', '--output', default=None, help='Output file with hyphenated words - one per line. If not given, writes to stdout.')
+    parser_hyphenate.add_argument('--engine', default='automaton', choices=PatternSet.ENGINES, help='Hyphenation engine (default: automaton)')
+    parser_hyphenate.add_argument('--cache-size', type=int, default=0, help='Size of LRU cache of hyphenated words (default: no cache)')
+    parser_hyphenate.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes (default: 1)')
+    parser_hyphenate.add_argument('--batch-size', type=int, default=10000, help='Number of words sent to a worker at once (default: 10000)')
+
+    # "serve" command
+    parser_serve = sub.add_parser('serve', help='Runs hyphenation service (HTTP on localhost or on a Unix socket)')
+    parser_serve.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser_serve.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser_serve.add_argument('--socket', default=None, help='If set, listens on this Unix socket instead of TCP port')
+    parser_serve.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes (default: 1)')
+    parser_serve.add_argument('--batch-size', type=int, default=1000, help='Max number of words in a batch (default: 1000)')
+    parser_serve.add_argument('--batch-delay', type=float, default=2, help='Max time (in milliseconds) to wait for more requests to fill a batch (default: 2)')
+    parser_serve.add_argument('--engine', default='automaton', choices=PatternSet.ENGINES, help='Hyphenation engine (default: automaton)')
+    parser_serve.add_argument('--cache-size', type=int, default=0, help='Size of LRU cache of hyphenated words (default: no cache)')
 
     # "explain" command
     parser_hyphenate = sub.add_parser('explain', help='Explains hyphenation for a list of words')
@@ -431,20 +770,29 @@ def main():
     parser_test.add_argument('dictionary', help='File name of a test dictionary')
     parser_test.add_argument('-p', '--patterns', help='Optional file to write errors as patterns')
     parser_test.add_argument('-e', '--errors', help='Optional file to write errors (for error analysis)')
+    parser_test.add_argument('--engine', default='automaton', choices=PatternSet.ENGINES, help='Hyphenation engine (default: automaton)')
+    parser_test.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used to evaluate patterns (default: 1)')
+    parser_test.add_argument('--cache', default=False, action='store_true', help='Use cache of per-layer predictions stored alongside the project (created if missing). Only layers missing from the cache are applied to the dictionary')
 
     # "swap" command
     parser_swap = sub.add_parser('swap', help='Swaps odd layers between two projects (advanced)')
     parser_swap.add_argument('project2', help='File name of a second project')
     parser_swap.add_argument('-c', '--commit', default=False, action='store_true', help='If set, swapped projects are saved')
+    parser_swap.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used to evaluate patterns (default: 1)')
+    parser_swap.add_argument('--cache', default=False, action='store_true', help='Use cache of per-layer predictions stored alongside the project (created if missing). Only layers missing from the cache are applied to the dictionary')
 
     # "compact" command
     parser_compact = sub.add_parser('compact', help='Removes redundancy from parterns')
     parser_compact.add_argument('-c', '--commit', default=False, action='store_true', help='If set, swapped projects are saved')
+    parser_compact.add_argument('--check', default=False, action='store_true', help='If set, evaluates compacted patterns on project dictionary')
+    parser_compact.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used to evaluate patterns (default: 1)')
+    parser_compact.add_argument('--cache', default=False, action='store_true', help='Use cache of per-layer predictions stored alongside the project (created if missing). Only layers missing from the cache are applied to the dictionary')
 
     # "import" command
     parser_import = sub.add_parser('import', help='Imports patterns from TeX file')
     parser_import.add_argument('input', help='Name of the TeX patterns file')
     parser_import.add_argument('-c', '--commit', default=False, action='store_true', help='If set, swapped projects are saved')
+    parser_import.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used to evaluate patterns (default: 1)')
 
     if '-v' in sys.argv or '--version' in sys.argv:
         print('PYPATGEN version:', __version__)
@@ -461,8 +809,16 @@ def main():
         parser.exit(main_export(args))
     elif args.cmd == 'hyphenate':
         parser.exit(main_hyphenate(args))
+    elif args.cmd == 'consolidate':
+        parser.exit(main_consolidate(args))
+    elif args.cmd == 'rollback':
+        parser.exit(main_rollback(args))
+    elif args.cmd == 'serve':
+        parser.exit(main_serve(args))
     elif args.cmd == 'explain':
         parser.exit(main_explain(args))
+    elif args.cmd == 'sweep':
+        parser.exit(main_sweep(args))
     elif args.cmd == 'batchtrain':
         parser.exit(main_batchtrain(args))
     elif args.cmd == 'test':
@@ -0,0 +1,211 @@
+'''
+Created on Oct 18, 2026
+
+Columnar dictionary store: a binary file that is opened through mmap, so that the dictionary is
+not parsed on load and worker processes share its pages.
+
+File layout (all integers are little-endian, every column starts at a multiple of 8 bytes):
+
+    header:     magic, version, number of words, size of word text, size of weight overrides, store id
+    offsets:    (number of words + 1) x uint64, offsets of words in the text column
+    hyphens:    number of words x uint64, position bitmask of every word
+    missed:     number of words x uint64
+    false:      number of words x uint64
+    order:      number of words x uint32, word ids sorted by UTF-8 encoded word (for lookups)
+    weights:    number of words x uint8, default weight of every word
+    text:       UTF-8 encoded words, concatenated
+    overrides:  marshal-ed mapping of word id to {position: weight}, for positions that do not
+                have the default weight of their word
+'''
+import marshal
+import mmap
+import os
+import struct
+from array import array
+from patgen.compact_dictionary import CompactDictionary, MAXLEN
+
+
+MAGIC = b'PGDICT01'
+VERSION = 1
+
+HEADER = struct.Struct('<8sIQQQ16s')
+
+# column name -> (attribute of MappedDictionary, memoryview format)
+_COLUMNS = {
+    'offsets': ('_offsets', 'Q'),
+    'hyphens': ('_hyphens', 'Q'),
+    'missed' : ('_missed', 'Q'),
+    'false'  : ('_false', 'Q'),
+    'order'  : ('_order', 'I'),
+    'weights': ('_default_weight', 'B'),
+    'text'   : ('_text', None),
+}
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _layout(num_words, text_size):
+    '''
+    Returns list of (column name, offset, size) and the offset of overrides
+    '''
+    columns = []
+    offset = _align(HEADER.size)
+    for name, size in [
+            ('offsets', 8 * (num_words + 1)),
+            ('hyphens', 8 * num_words),
+            ('missed', 8 * num_words),
+            ('false', 8 * num_words),
+            ('order', 4 * num_words),
+            ('weights', num_words),
+            ('text', text_size)]:
+        columns.append((name, offset, size))
+        offset = _align(offset + size)
+    return columns, offset
+
+
+def is_store(filename):
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_store(filename, dictionary):
+    '''
+    Writes any dictionary (including its errors and weights) as a columnar store
+    '''
+    text = bytearray()
+    offsets = array('Q', [0])
+    hyphens = array('Q')
+    missed = array('Q')
+    false = array('Q')
+    weights = array('B')
+    overrides = {}
+    keys = []
+
+    for i, (word, hyph, miss, fals, w) in enumerate(dictionary.mask_records()):
+        if len(word) > MAXLEN:
+            raise ValueError('word is too long for dictionary store (max %s letters): %s' % (MAXLEN, word))
+        key = word.encode('utf-8')
+        keys.append(key)
+        text.extend(key)
+        offsets.append(len(text))
+        hyphens.append(hyph)
+        missed.append(miss)
+        false.append(fals)
+        default = w[0]
+        weights.append(default)
+        override = dict((k, v) for k, v in w.items() if v != default)
+        if override:
+            overrides[i] = override
+
+    order = array('I', sorted(range(len(keys)), key=keys.__getitem__))
+    overrides = marshal.dumps(overrides)
+
+    data = {
+        'offsets': offsets.tobytes(),
+        'hyphens': hyphens.tobytes(),
+        'missed' : missed.tobytes(),
+        'false'  : false.tobytes(),
+        'order'  : order.tobytes(),
+        'weights': weights.tobytes(),
+        'text'   : bytes(text),
+    }
+
+    columns, overrides_offset = _layout(len(keys), len(text))
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys), len(text), len(overrides), os.urandom(16)))
+        for name, offset, _ in columns:
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(data[name])
+        f.write(b'\0' * (overrides_offset - f.tell()))
+        f.write(overrides)
+
+
+class MappedDictionary(CompactDictionary):
+    ''' Dictionary backed by a memory-mapped columnar store (see write_store).
+
+    Columns are used in place. The file is mapped copy-on-write: training updates missed and
+    false columns in memory, the store file itself is never modified. Words can not be added.
+
+    When pickled (e.g. as part of a project), only the store filename and the missed and false
+    columns are saved, so the store file must stay where it is.
+    '''
+
+    def __init__(self, filename):
+        self.filename = os.path.abspath(filename)
+
+        with open(self.filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, version, num_words, text_size, overrides_size, self.store_id = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise RuntimeError('Not a dictionary store file: %s' % filename)
+        if version != VERSION:
+            raise RuntimeError('Incompatible dictionary store version: %s (expected %s)' % (version, VERSION))
+
+        columns, overrides_offset = _layout(num_words, text_size)
+        view = memoryview(self._mmap)
+        for name, offset, size in columns:
+            attr, fmt = _COLUMNS[name]
+            column = view[offset:offset+size]
+            setattr(self, attr, column.cast(fmt) if fmt else column)
+        self._weight_overrides = marshal.loads(self._mmap[overrides_offset:overrides_offset+overrides_size])
+
+        self._recent = {}
+        self._totals = None
+
+    def __reduce__(self):
+        return _restore, (self.filename, self.store_id, self._missed.tobytes(), self._false.tobytes())
+
+    def _word(self, i):
+        return self._text[self._offsets[i]:self._offsets[i+1]].tobytes().decode('utf-8')
+
+    def _codes(self, i):
+        return self._text[self._offsets[i]:self._offsets[i+1]].tobytes()
+
+    def _fold(self):
+        pass  # order is stored in the file
+
+    def _lookup(self, word, fold=True):
+        key = word.encode('utf-8')
+
+        order = self._order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._codes(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and self._codes(order[lo]) == key:
+            return order[lo]
+        return None
+
+    def add_masks(self, word, hyphens, missed, false, weights=None):
+        raise TypeError('dictionary store is read-only, can not add: %s' % word)
+
+    @classmethod
+    def load(cls, filename, jobs=1):
+        return cls(filename)
+
+    @classmethod
+    def from_batches(cls, batches, jobs=1):
+        raise TypeError('dictionary store can only be opened from a file, see write_store')
+
+    @classmethod
+    def from_dictionary(cls, dictionary, filename):
+        '''
+        Writes :dictionary: to a store file and opens it
+        '''
+        write_store(filename, dictionary)
+        return cls(filename)
+
+
+def _restore(filename, store_id, missed, false):
+    dictionary = MappedDictionary(filename)
+    if dictionary.store_id != store_id:
+        raise RuntimeError('Dictionary store was re-written since the project was saved: %s' % filename)
+    dictionary._missed[:] = array('Q', missed)
+    dictionary._false[:] = array('Q', false)
+    return dictionary
@@ -0,0 +1,170 @@
+'''
+Created on Oct 18, 2026
+'''
+from patgen.bitmask import iter_bits, to_set
+
+
+def pattern_controls(patternset):
+    '''
+    Merges all layers of a pattern set into a single mapping of pattern key to its control
+    (a mapping of hyphen index to level), same as PatternSet.get_pattern_control. Patterns longer
+    than layer's maxchunk are skipped, because Layer.predict never looks at them.
+    '''
+    controls = {}
+    for level0, layer in enumerate(patternset):
+        maxchunk = layer.maxchunk
+        for key, mask in layer.masks().items():
+            if len(key) > maxchunk:
+                continue
+            control = controls.setdefault(key, {})
+            for index in iter_bits(mask):
+                control[index] = level0 + 1
+    return controls
+
+
+class PatternMatcher:
+    ''' Aho-Corasick automaton built from patterns of all layers.
+
+    Every node carries outputs of all patterns that end at it, as (delta, level) pairs. When a pattern
+    ends at offset j of the padded word, it sets the level of hyphen index j + delta.
+    A single left-to-right scan computes TeX-style max level for every inter-letter position.
+    Odd levels hyphenate.
+    '''
+
+    def __init__(self, controls):
+        goto = [{}]
+        outputs = [()]
+
+        for key, control in controls.items():
+            state = 0
+            for c in key:
+                nxt = goto[state].get(c)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][c] = nxt
+                    goto.append({})
+                    outputs.append(())
+                state = nxt
+            outputs[state] = tuple((index - len(key), level) for index, level in sorted(control.items()))
+
+        # failure links, breadth-first
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for c, nxt in goto[state].items():
+                f = fail[state]
+                while f and c not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(c, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+                queue.append(nxt)
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+
+    def __len__(self):
+        return len(self._goto)
+
+    @classmethod
+    def build(cls, patternset):
+        return cls(pattern_controls(patternset))
+
+    def levels(self, word, margins):
+        '''
+        Returns a mapping of hyphen index to the max level of patterns that hit it
+        '''
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+
+        left = margins.left
+        right = len(word) - margins.right
+
+        levels = {}
+        state = 0
+        for j, c in enumerate('.' + word + '.'):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for delta, level in outputs[state]:
+                index = j + delta
+                if left <= index <= right and level > levels.get(index, 0):
+                    levels[index] = level
+
+        return levels
+
+    def hyphenate(self, word, margins):
+        return to_set(self.hyphenate_mask(word, margins))
+
+    def hyphenate_mask(self, word, margins):
+        mask = 0
+        for index, level in self.levels(word, margins).items():
+            if level & 1:
+                mask |= 1 << index
+        return mask
+
+
+class PatternTable:
+    ''' Flattened pattern table: maps every pattern key to its level vector.
+
+    Level vector of a key of length n has n+1 entries, entry i is the level of hyphen after i-th letter
+    of the key (0 if pattern does not control it), like digits in TeX patterns. Hyphenation does one
+    lookup per substring of the padded word, no matter how many layers there are.
+    '''
+
+    def __init__(self, controls):
+        self._table = {}
+        self.maxchunk = 0
+
+        for key, control in controls.items():
+            vector = [0] * (len(key) + 1)
+            for index, level in control.items():
+                vector[index] = level
+            self._table[key] = tuple(vector)
+            self.maxchunk = max(self.maxchunk, len(key))
+
+    def __len__(self):
+        return len(self._table)
+
+    def __getitem__(self, key):
+        return self._table[key]
+
+    def items(self):
+        return self._table.items()
+
+    @classmethod
+    def build(cls, patternset):
+        return cls(pattern_controls(patternset))
+
+    def levels(self, word, margins):
+        table = self._table
+
+        left = margins.left
+        right = len(word) - margins.right
+
+        word = '.' + word + '.'
+
+        levels = {}
+        for chunklen in range(1, min(self.maxchunk, len(word)) + 1):
+            for start in range(0, len(word) - chunklen + 1):
+                vector = table.get(word[start:start+chunklen])
+                if vector is None:
+                    continue
+                for index, level in enumerate(vector):
+                    if level:
+                        index += start - 1
+                        if left <= index <= right and level > levels.get(index, 0):
+                            levels[index] = level
+
+        return levels
+
+    def hyphenate(self, word, margins):
+        return to_set(self.hyphenate_mask(word, margins))
+
+    def hyphenate_mask(self, word, margins):
+        mask = 0
+        for index, level in self.levels(word, margins).items():
+            if level & 1:
+                mask |= 1 << index
+        return mask
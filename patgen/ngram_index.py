@@ -0,0 +1,159 @@
+'''
+Created on Oct 18, 2026
+'''
+import collections
+import hashlib
+import struct
+from array import array
+from patgen.bitmask import to_set, margin_mask
+
+
+MAGIC = b'PGNGRAM1'
+
+
+def fingerprint(dictionary, margins):
+    '''
+    Identifies dictionary word list and hyphenation margins the index was built for
+    '''
+    h = hashlib.sha1()
+    h.update(repr(tuple(margins)).encode('utf-8'))
+    for word in dictionary.keys():
+        h.update(word.encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+class NgramIndex:
+    ''' Inverted index of all chunks of padded dictionary words.
+
+    Maps every chunk of '.' + word + '.' (up to :maxlen: letters) to the list of its
+    occurrences (word id, start offset). Word ids are positions of words in dictionary order.
+
+    Occurrences of all chunks are stored in one flat array, each packed as (word_id << 16 | start).
+    '''
+
+    VERSION = 1
+
+    def __init__(self, maxlen, fingerprint, keys, starts, occurrences, lengths):
+        self.maxlen = maxlen
+        self.fingerprint = fingerprint
+        self._keys = keys  # chunk -> chunk number
+        self._starts = starts  # chunk number -> offset in occurrences array
+        self._occurrences = occurrences
+        self._lengths = lengths  # word id -> word length
+
+    def __len__(self):
+        return len(self._keys)
+
+    @classmethod
+    def build(cls, dictionary, margins, maxlen):
+        occurrences = collections.defaultdict(list)
+        lengths = array('H')
+
+        for word_id, word in enumerate(dictionary.keys()):
+            lengths.append(len(word))
+            word = '.' + word + '.'
+            for chunklen in range(1, maxlen + 1):
+                for start in range(0, len(word) - chunklen + 1):
+                    occurrences[word[start:start+chunklen]].append(word_id << 16 | start)
+
+        keys = {}
+        starts = array('Q', [0])
+        flat = array('Q')
+        for ch in sorted(occurrences.keys()):
+            keys[ch] = len(keys)
+            flat.extend(occurrences[ch])
+            starts.append(len(flat))
+
+        return cls(maxlen, fingerprint(dictionary, margins), keys, starts, flat, lengths)
+
+    def is_valid(self, dictionary, margins):
+        return self.fingerprint == fingerprint(dictionary, margins)
+
+    def occurrences(self, chunk):
+        '''
+        Yields (word_id, start) for every occurrence of the chunk
+        '''
+        i = self._keys.get(chunk)
+        if i is None:
+            return
+
+        for packed in self._occurrences[self._starts[i]:self._starts[i+1]]:
+            yield packed >> 16, packed & 0xffff
+
+    def predict(self, layer, margins):
+        '''
+        Same as Layer.predict applied to every dictionary word, but only
+        looks at words that contain layer patterns.
+
+        Returns a mapping of word id to the set of predicted indices.
+        '''
+        return dict((word_id, to_set(mask)) for word_id, mask in self.predict_masks(layer, margins).items())
+
+    def predict_masks(self, layer, margins):
+        '''
+        Same as predict, but predicted indices are returned as bitmasks
+        '''
+        prediction = collections.defaultdict(int)
+        lengths = self._lengths
+
+        for key, mask in layer.masks().items():
+            if len(key) > layer.maxchunk:
+                continue
+            for word_id, start in self.occurrences(key):
+                prediction[word_id] |= mask << start
+
+        masks = {}
+        for word_id, mask in prediction.items():
+            mask = (mask >> 1) & margin_mask(lengths[word_id], margins)
+            if mask:
+                masks[word_id] = mask
+
+        return masks
+
+    def covers(self, layer):
+        '''
+        Tests if all patterns of a layer are short enough to be found in the index
+        '''
+        return all(len(key) <= self.maxlen for key in layer.keys())
+
+    def save(self, filename):
+        keys = sorted(self._keys, key=self._keys.get)
+        text = '\n'.join(keys).encode('utf-8')
+        header = '%s\n%s\n%s\n' % (self.VERSION, self.maxlen, self.fingerprint)
+
+        with open(filename, 'wb') as f:
+            f.write(MAGIC)
+            for block in (header.encode('utf-8'), text, self._lengths.tobytes(),
+                          self._starts.tobytes(), self._occurrences.tobytes()):
+                f.write(struct.pack('<Q', len(block)))
+                f.write(block)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise RuntimeError('Not an n-gram index file: %s' % filename)
+
+            blocks = []
+            for _ in range(5):
+                size, = struct.unpack('<Q', f.read(8))
+                blocks.append(f.read(size))
+
+        header, text, lengths_bytes, starts_bytes, occurrences_bytes = blocks
+
+        version, maxlen, fprint = header.decode('utf-8').split('\n')[:3]
+        if int(version) != cls.VERSION:
+            raise RuntimeError('Incompatible n-gram index version: %s (expected %s)' % (version, cls.VERSION))
+
+        text = text.decode('utf-8')
+        keys = dict((ch, i) for i, ch in enumerate(text.split('\n'))) if text else {}
+
+        lengths = array('H')
+        lengths.frombytes(lengths_bytes)
+        starts = array('Q')
+        starts.frombytes(starts_bytes)
+        occurrences = array('Q')
+        occurrences.frombytes(occurrences_bytes)
+
+        return cls(int(maxlen), fprint, keys, starts, occurrences, lengths)
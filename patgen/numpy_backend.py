@@ -0,0 +1,140 @@
+'''
+Created on Oct 18, 2026
+
+NumPy implementation of pattern statistics. Importing this module fails if NumPy is not installed,
+use patgen.statistics.set_backend() to select it.
+'''
+import numpy as np
+from patgen.bitmask import iter_bits
+
+
+def fits(alphabet_size, patt_len):
+    '''
+    Tests if (chunk, position) keys can be packed into 64-bit integers
+    '''
+    return (alphabet_size + 1) ** patt_len * (patt_len + 1) < 2 ** 63
+
+
+class EncodedRecords:
+    ''' Dictionary records laid out as flat arrays.
+
+    Every padded word '.' + word + '.' occupies len(word)+2 consecutive slots. A hyphen index h
+    of a word starting at slot b is stored at slot b+h.
+    '''
+
+    def __init__(self, records):
+        alphabet = {'.': 1}
+        codes = []
+        length = []
+        local = []
+        weights = []
+        hyphens = []
+        missed = []
+        false = []
+
+        for word, h, m, f, w in records:
+            base = len(codes)
+            codes.append(1)
+            for c in word:
+                code = alphabet.get(c)
+                if code is None:
+                    code = alphabet[c] = len(alphabet) + 1
+                codes.append(code)
+            codes.append(1)
+
+            length.extend([len(word)] * (len(word) + 2))
+            local.extend(range(len(word) + 2))
+            weights.extend(w[i] for i in range(len(word) + 1))
+            weights.append(0)
+            hyphens.extend(base + i for i in iter_bits(h))
+            missed.extend(base + i for i in iter_bits(m))
+            false.extend(base + i for i in iter_bits(f))
+
+        self.letters = dict((code, c) for c, code in alphabet.items())
+        self.codes = np.array(codes, dtype=np.int64)
+        self.length = np.array(length, dtype=np.int64)
+        self.local = np.array(local, dtype=np.int64)
+        self.weights = np.array(weights, dtype=np.int64)
+
+        self.hyphens = np.zeros(len(codes), dtype=bool)
+        self.hyphens[np.array(hyphens, dtype=np.int64)] = True
+        self.missed = np.zeros(len(codes), dtype=bool)
+        self.missed[np.array(missed, dtype=np.int64)] = True
+        self.false = np.zeros(len(codes), dtype=bool)
+        self.false[np.array(false, dtype=np.int64)] = True
+
+    def decode(self, code, patt_len):
+        chars = []
+        for _ in range(patt_len):
+            code, c = divmod(code, len(self.letters) + 1)
+            chars.append(self.letters[c])
+        return ''.join(reversed(chars))
+
+
+def collect_statistics(records, inhibiting, patt_len, margins, stats):
+    '''
+    Fills PatternStatistics object :stats: with the same counts as
+    patgen.statistics.collect_statistics computes.
+
+    Returns False (leaving stats untouched) if keys can not be packed into 64-bit integers,
+    so that caller can fall back to the pure-Python implementation.
+    '''
+    enc = EncodedRecords(records)
+    if not fits(len(enc.letters), patt_len):
+        return False
+
+    num_windows = len(enc.codes) - patt_len + 1
+    if num_windows <= 0:
+        return True
+
+    base = len(enc.letters) + 1
+    code = np.zeros(num_windows, dtype=np.int64)
+    for k in range(patt_len):
+        code = code * base + enc.codes[k:k+num_windows]
+
+    start = enc.local[:num_windows]
+    length = enc.length[:num_windows]
+    window_valid = start + patt_len <= length + 2
+
+    keys = []
+    weights = []
+    good = []
+    for position in range(patt_len + 1):
+        index = start + position - 1
+        valid = window_valid & (position <= length) & (index >= margins.left) & (index <= length - margins.right)
+
+        slot = np.clip(np.arange(num_windows) + position - 1, 0, None)
+
+        if not inhibiting:
+            is_good = enc.missed[slot]
+            is_bad = ~is_good & ~enc.hyphens[slot]
+        else:
+            is_good = enc.false[slot]
+            is_bad = ~is_good & enc.hyphens[slot] & ~enc.missed[slot]
+
+        selected = valid & (is_good | is_bad)
+        keys.append(code[selected] * (patt_len + 1) + position)
+        weights.append(enc.weights[slot[selected]])
+        good.append(is_good[selected])
+
+    keys = np.concatenate(keys)
+    weights = np.concatenate(weights)
+    good = np.concatenate(good)
+
+    unique, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.ravel()
+    num_good = np.bincount(inverse, weights=good, minlength=len(unique))
+    num_bad = np.bincount(inverse, weights=~good, minlength=len(unique))
+    good_weight = np.bincount(inverse, weights=np.where(good, weights, 0), minlength=len(unique))
+    bad_weight = np.bincount(inverse, weights=np.where(good, 0, weights), minlength=len(unique))
+
+    for key, ng, nb, gw, bw in zip(unique.tolist(), num_good.tolist(), num_bad.tolist(), 
+                                   good_weight.tolist(), bad_weight.tolist()):
+        code, position = divmod(key, patt_len + 1)
+        ch = enc.decode(code, patt_len)
+        if ng:
+            stats.good[ch, position] += int(round(gw))
+        if nb:
+            stats.bad[ch, position] += int(round(bw))
+
+    return True
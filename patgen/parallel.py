@@ -0,0 +1,292 @@
+'''
+Created on Oct 18, 2026
+'''
+import collections
+import multiprocessing
+import itertools
+import pickle
+import time
+from patgen.block import decode_block
+from patgen.bitmask import to_set, weighted_sum
+from patgen.statistics import collect_statistics, PatternStatistics
+from patgen import statistics
+from patgen.range import Range
+from patgen.selector import Selector
+
+
+# per-process state, set up once by the pool initializer
+_worker = {}
+
+
+def imap(func, tasks, jobs=1, initializer=None, initargs=()):
+    '''
+    Applies func to every task and yields results in task order.
+
+    If jobs > 1, tasks are executed in a pool of :jobs: processes. Each process
+    calls initializer(*initargs) once before running any task. If jobs <= 1, everything
+    runs in the current process, using exactly the same code path.
+    '''
+    if jobs <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for task in tasks:
+            yield func(task)
+        return
+
+    pool = multiprocessing.Pool(jobs, initializer, initargs)
+    try:
+        for result in pool.imap(func, tasks):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def imap_bounded(func, tasks, jobs=1, initializer=None, initargs=(), max_pending=None):
+    '''
+    Same as imap, but tasks are consumed lazily: at most :max_pending: tasks (default: 2*jobs)
+    are submitted ahead of the consumer. Use it for long (or endless) streams of tasks.
+    '''
+    if jobs <= 1:
+        for result in imap(func, tasks, initializer=initializer, initargs=initargs):
+            yield result
+        return
+
+    if max_pending is None:
+        max_pending = 2 * jobs
+
+    pool = multiprocessing.Pool(jobs, initializer, initargs)
+    try:
+        pending = collections.deque()
+        for task in tasks:
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(func, (task,)))
+
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def init_training(dictionary, margins, inhibiting, selector, backend='python'):
+    statistics.set_backend(backend)
+    _worker['dictionary'] = dictionary
+    _worker['margins'] = margins
+    _worker['inhibiting'] = inhibiting
+    _worker['selector'] = selector
+
+
+def select_patterns(patlen):
+    '''
+    Computes statistics for all hyphen positions of a given pattern length
+    and returns patterns selected by the layer selector
+    '''
+    dictionary = _worker['dictionary']
+    stats = dictionary.collect_pattern_statistics(_worker['inhibiting'], patlen, _worker['margins'])
+    return dict(stats.select(_worker['selector']))
+
+
+def pattern_statistics(patlen):
+    dictionary = _worker['dictionary']
+    return dictionary.collect_pattern_statistics(_worker['inhibiting'], patlen, _worker['margins'])
+
+
+def collect_layer_statistics(dictionary, margins, inhibiting, patlens, jobs=1):
+    '''
+    Computes pattern statistics for every pattern length.
+
+    Yields (patlen, statistics) in the order of :patlens:
+    '''
+    patlens = list(patlens)
+    results = imap(pattern_statistics, patlens, jobs=jobs,
+                   initializer=init_training, initargs=(dictionary, margins, inhibiting, None, statistics.get_backend()))
+
+    for patlen, stats in zip(patlens, results):
+        yield patlen, stats
+
+
+def init_scoring(dictionary, margins, index):
+    _worker['dictionary'] = dictionary
+    _worker['margins'] = margins
+    _worker['index'] = index
+
+
+def score_layer(layer):
+    '''
+    Returns weighted missed and false hyphens that dictionary would have if layer was applied to it
+    '''
+    return layer.apply_to_dictionary(layer.inhibiting, _worker['dictionary'], _worker['margins'], 
+                                     index=_worker['index'], commit=False)
+
+
+def score_layers(dictionary, margins, layers, jobs=1, index=None):
+    '''
+    Scores candidate layers (see score_layer). Dictionary is not changed.
+
+    Yields (missed, false) in the order of :layers:
+    '''
+    dictionary.error_totals()  # compute running totals once, before workers are started
+    return imap(score_layer, layers, jobs=jobs, initializer=init_scoring, initargs=(dictionary, margins, index))
+
+
+def init_sharded(blocks, margins, inhibiting, backend='python'):
+    statistics.set_backend(backend)
+    _worker['blocks'] = blocks
+    _worker['margins'] = margins
+    _worker['inhibiting'] = inhibiting
+
+
+def collect_shard(task):
+    '''
+    Computes statistics of a given pattern length over a single dictionary shard
+    '''
+    patlen, shard = task
+    records = decode_block(_worker['blocks'][shard])
+    return collect_statistics(records, _worker['inhibiting'], patlen, _worker['margins'])
+
+
+def _sharded_statistics(blocks, inhibiting, patlens, margins, jobs):
+    '''
+    Yields (patlen, statistics) for every pattern length, summing up statistics of all shards
+    '''
+    tasks = [(patlen, shard) for patlen in patlens for shard in range(len(blocks))]
+    results = imap(collect_shard, tasks, jobs=jobs, initializer=init_sharded, initargs=(blocks, margins, inhibiting, statistics.get_backend()))
+
+    for patlen, group in itertools.groupby(zip(tasks, results), key=lambda x: x[0][0]):
+        stats = PatternStatistics()
+        for _, part in group:
+            stats.update(part)
+        yield patlen, stats
+
+
+def collect_sharded_statistics(blocks, inhibiting, patt_len, margins, jobs=1):
+    '''
+    Map-reduce version of Dictionary.collect_pattern_statistics. Takes dictionary shards
+    as serialized blocks (see Dictionary.shards).
+    '''
+    for _, stats in _sharded_statistics(blocks, inhibiting, [patt_len], margins, jobs):
+        return stats
+    return PatternStatistics()
+
+
+def train_patterns(dictionary, margins, inhibiting, selector, patlens, jobs=1, shards=1):
+    '''
+    Trains patterns of all requested lengths. Dictionary state is not changed, therefore
+    every pattern length (and every dictionary shard, if shards > 1) can be processed independently.
+
+    Yields (patlen, patterns) in the order of :patlens:
+    '''
+    patlens = list(patlens)
+
+    if shards > 1:
+        blocks = list(dictionary.shards(shards))
+        for patlen, stats in _sharded_statistics(blocks, inhibiting, patlens, margins, jobs):
+            yield patlen, dict(stats.select(selector))
+        return
+
+    results = imap(select_patterns, patlens, jobs=jobs,
+                   initializer=init_training, initargs=(dictionary, margins, inhibiting, selector, statistics.get_backend()))
+
+    for patlen, patterns in zip(patlens, results):
+        yield patlen, patterns
+
+
+def init_search(snapshot, index=None, backend='python', quiet=True):
+    '''
+    Unpickles the base project once per process. All candidates trained by the process share
+    its dictionary: only missed and false hyphens of changed words are reset between candidates
+    '''
+    statistics.set_backend(backend)
+    project = pickle.loads(snapshot)
+    project.index = index
+    errors = [(missed, false) for _, _, missed, false, _ in project.dictionary.mask_records()]
+    _worker['project'] = project
+    _worker['base'] = (len(project.patternset), project.missed, project.false, errors)
+    _worker['quiet'] = quiet
+
+
+def train_candidate(task):
+    '''
+    Trains a sequence of layers on top of the base project, then resets project to the base state.
+
+    Returns (name, missed, false, layers, elapsed)
+    '''
+    name, specs = task
+    project = _worker['project']
+    num_layers, missed, false, errors = _worker['base']
+
+    start = time.time()
+    project.dictionary.track_changes()
+    try:
+        for params in specs:
+            project.train_new_layer(Range.parse(params['range']), Selector.parse(params['selector']), quiet=_worker['quiet'])
+        layers = list(project.patternset[num_layers:])
+
+        return name, project.missed, project.false, layers, time.time() - start
+    finally:
+        changed = project.dictionary.changed_errors()
+        project.dictionary.set_errors(dict((i, errors[i]) for i in changed))
+        del project.patternset[num_layers:]
+        project.missed, project.false = missed, false
+
+
+def search_candidates(project, candidates, jobs=1):
+    '''
+    Trains every candidate (name, specs) starting from the same base project. Every worker unpickles
+    a single snapshot of the project and trains its candidates one after another on that copy
+    (see train_candidate). Training output is suppressed in worker processes.
+
+    Yields (name, missed, false, layers, elapsed) in the order of :candidates:
+    '''
+    snapshot = pickle.dumps(project, pickle.HIGHEST_PROTOCOL)
+
+    return imap(train_candidate, candidates, jobs=jobs, initializer=init_search, 
+                initargs=(snapshot, project.index, statistics.get_backend(), jobs > 1))
+
+
+def init_evaluation(patternset, margins, engine='automaton'):
+    _worker['patternset'] = patternset
+    _worker['margins'] = margins
+    _worker['engine'] = engine
+
+
+def evaluate_shard(block):
+    '''
+    Hyphenates all words of a dictionary shard.
+
+    Returns (errors, missed, false), where errors is the list of (word, hyphens, missed, false) for
+    wrongly hyphenated words, and missed and false are weighted totals of the shard
+    '''
+    patternset = _worker['patternset']
+    margins = _worker['margins']
+    engine = _worker['engine']
+
+    errors = []
+    num_missed = 0
+    num_false = 0
+    for word, hyphens, _, _, weights in decode_block(block):
+        prediction = patternset.hyphenate_mask(word, margins=margins, engine=engine)
+
+        missed = hyphens & ~prediction
+        false = prediction & ~hyphens
+
+        if missed or false:
+            errors.append((word, to_set(hyphens), to_set(missed), to_set(false)))
+            num_missed += weighted_sum(missed, weights)
+            num_false += weighted_sum(false, weights)
+
+    return errors, num_missed, num_false
+
+
+def evaluate_shards(dictionary, patternset, margins, jobs=1, engine='automaton', shards_per_job=8):
+    '''
+    Evaluates pattern set against dictionary split into shards, see evaluate_shard.
+
+    Yields results of every shard, in dictionary order. Shards are serialized lazily, 
+    only a few of them are in flight at any time.
+    '''
+    blocks = dictionary.shards(jobs * shards_per_job)
+    return imap_bounded(evaluate_shard, blocks, jobs=jobs, 
+                        initializer=init_evaluation, initargs=(patternset, margins, engine))
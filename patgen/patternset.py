@@ -3,15 +3,67 @@ Created on Mar 7, 2016
 
 @author: mike
 '''
-from patgen import EMPTYSET, DIGITS
+from patgen import DIGITS
 from patgen.suffix_array import SuffixArray
+from patgen.matcher import PatternMatcher, PatternTable
+from patgen.cache import WordCache
+from patgen.bitmask import iter_bits, to_set, weighted_sum
+from patgen import parallel
 
 
 class PatternSet(list):
 
+    # hyphenation engines:
+    #   automaton - Aho-Corasick automaton built from all layers (PatternMatcher)
+    #   table     - merged table of pattern level vectors (PatternTable)
+    #   layers    - apply layers one by one
+    ENGINES = ('automaton', 'table', 'layers')
+
+    _compiled = None
+    _compiled_key = ()
+    _cache = None
+
     def __init__(self):
         list.__init__(self)
 
+    def __getstate__(self):
+        return {}  # compiled matchers and word cache are never stored
+
+    def __setstate__(self, state):
+        pass
+
+    def compiled(self, engine):
+        '''
+        Returns PatternMatcher or PatternTable compiled from all layers. These are re-built lazily, whenever
+        layers are added, removed, replaced or modified.
+        '''
+        key = self.layers_key()
+        if self._compiled is None or key != self._compiled_key:
+            self._compiled = {}
+            self._compiled_key = key
+
+        if engine not in self._compiled:
+            if engine == 'automaton':
+                self._compiled[engine] = PatternMatcher.build(self)
+            elif engine == 'table':
+                self._compiled[engine] = PatternTable.build(self)
+            else:
+                raise ValueError('unknown hyphenation engine: %s (expected one of: %s)' % (engine, ', '.join(self.ENGINES)))
+
+        return self._compiled[engine]
+
+    def layers_key(self):
+        '''
+        Identifies current state of layers: changes whenever layers are added, removed, replaced or modified
+        '''
+        return tuple((layer, layer._version) for layer in self)
+
+    def matcher(self):
+        return self.compiled('automaton')
+
+    def table(self):
+        return self.compiled('table')
+
     @property
     def maxchunk(self):
         if len(self) == 0:
@@ -19,16 +71,55 @@ class PatternSet(list):
         
         return max(x.maxchunk for x in self)
 
-    def hyphenate(self, word, margins):
-        
-        prediction = set()
+    @property
+    def cache(self):
+        return self._cache
+
+    def set_cache_size(self, maxsize):
+        '''
+        Enables LRU cache of hyphenated words (keyed by word and margins). Zero disables the cache.
+        '''
+        self._cache = WordCache(maxsize) if maxsize > 0 else None
+
+    def hyphenate(self, word, margins, engine='automaton'):
+        return to_set(self.hyphenate_mask(word, margins, engine=engine))
+
+    def hyphenate_mask(self, word, margins, engine='automaton'):
+        '''
+        Same as hyphenate, but returns a bitmask of hyphen indices
+        '''
+        cache = self._cache
+        if cache is not None:
+            cache.validate(self.layers_key())
+            prediction = cache.get((word, margins))
+            if prediction is not None:
+                return prediction
+
+        if engine == 'layers':
+            prediction = self.hyphenate_layers_mask(word, margins)
+        else:
+            prediction = self.compiled(engine).hyphenate_mask(word, margins)
+
+        if cache is not None:
+            cache.put((word, margins), prediction)
+
+        return prediction
+
+    def hyphenate_layers(self, word, margins):
+        '''
+        Same as hyphenate, but applies layers one by one
+        '''
+        return to_set(self.hyphenate_layers_mask(word, margins))
+
+    def hyphenate_layers_mask(self, word, margins):
+        prediction = 0
         for i, layer in enumerate(self):
             if (i & 1) == 0:
                 # hyphenation layer
-                prediction.update(layer.predict(word, margins))
+                prediction |= layer.predict_mask(word, margins)
             else:
                 # inhibiting layer
-                prediction.difference_update(layer.predict(word, margins))
+                prediction &= ~layer.predict_mask(word, margins)
         
         return prediction
     
@@ -65,25 +156,30 @@ class PatternSet(list):
 
         control = {}
         for level0, layer in enumerate(self):
-            for index in layer.get(key, EMPTYSET):
+            for index in iter_bits(layer.masks().get(key, 0)):
                 control[index] = level0 + 1
 
         return control
 
     def set_pattern_control(self, key, control):
-        for layer in self:
-            layer[key].clear()
-            
+        positions = [set() for _ in self]
         for i, level in control.items():
             if level > 0:  # paranoid
-                layer = self[level - 1]
-                layer[key].add(i)
+                positions[level - 1].add(i)
+
+        for layer, pos in zip(self, positions):
+            if pos or key in layer:
+                layer[key] = pos
 
     def compact(self):
         patterns = {}
+        changed = set()
 
         for key in self.keys():
-            patterns[key] = self.get_pattern_control(key)
+            control = self.get_pattern_control(key)
+            patterns[key] = control
+            if sum(bin(layer.masks().get(key, 0)).count('1') for layer in self) > len(control):
+                changed.add(key)  # position is set in more than one layer, only the highest level is kept
 
         suffix_array = SuffixArray.build(patterns.keys())
 
@@ -99,9 +195,10 @@ class PatternSet(list):
                     lval = lcontrol.get(offset + i, 0)
                     if 0 < lval <= val:
                         del lcontrol[offset + i] 
+                        changed.add(lkey)
 
-        for key, control in patterns.items():
-            self.set_pattern_control(key, control)
+        for key in changed:
+            self.set_pattern_control(key, patterns[key])
 
     @staticmethod
     def format_pattern(key, control):
@@ -127,25 +224,54 @@ class PatternSet(list):
 
         return ''.join(text), control
 
-    def errors(self, dictionary, margins):
+    def errors(self, dictionary, margins, engine='automaton', jobs=1):
 
-        for word, hyphens in dictionary.items():
-            prediction = self.hyphenate(word, margins=margins) 
+        if jobs > 1:
+            for errors, _, _ in parallel.evaluate_shards(dictionary, self, margins, jobs=jobs, engine=engine):
+                for error in errors:
+                    yield error
+            return
 
-            missed = hyphens - prediction
-            false  = prediction - hyphens
+        for word, hyphens, missed, false in self.error_masks(dictionary, margins, engine=engine):
+            yield word, to_set(hyphens), to_set(missed), to_set(false)
+
+    def error_masks(self, dictionary, margins, engine='automaton'):
+        '''
+        Same as errors, but hyphens, missed and false positions are bitmasks
+        '''
+        for word, hyphens in dictionary.mask_items():
+            prediction = self.hyphenate_mask(word, margins=margins, engine=engine)
+
+            missed = hyphens & ~prediction
+            false  = prediction & ~hyphens
             
             if missed or false:
                 yield word, hyphens, missed, false
 
-    def evaluate(self, dictionary, margins):
-        
+    def evaluate(self, dictionary, margins, engine='automaton', jobs=1, sinks=()):
+        '''
+        Returns weighted (missed, false) totals. Every error (word, hyphens, missed, false) is also
+        passed to all :sinks: callables, so that error lists can be written in the same pass.
+        '''
         num_missed = 0
         num_false = 0
+
+        if jobs > 1:
+            for errors, missed, false in parallel.evaluate_shards(dictionary, self, margins, jobs=jobs, engine=engine):
+                for error in errors:
+                    for sink in sinks:
+                        sink(*error)
+                num_missed += missed
+                num_false  += false
+            return num_missed, num_false
         
-        for word, _, missed, false in self.errors(dictionary, margins):
+        for word, hyphens, missed, false in self.error_masks(dictionary, margins, engine=engine):
+            if sinks:
+                error = word, to_set(hyphens), to_set(missed), to_set(false)
+                for sink in sinks:
+                    sink(*error)
             w = dictionary.weights[word]
-            num_missed += sum(w[i] for i in missed)
-            num_false  += sum(w[i] for i in false)
+            num_missed += weighted_sum(missed, w)
+            num_false  += weighted_sum(false, w)
         
         return num_missed, num_false
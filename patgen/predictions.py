@@ -0,0 +1,117 @@
+'''
+Created on Oct 18, 2026
+'''
+import hashlib
+import marshal
+import zlib
+from patgen.bitmask import to_set, weighted_sum
+from patgen.ngram_index import fingerprint
+
+
+MAGIC = b'PGPRED01'
+
+
+def layer_fingerprint(layer, margins):
+    '''
+    Identifies predictions of a layer: its patterns, max pattern length and hyphenation margins
+    '''
+    h = hashlib.sha1()
+    h.update(repr((tuple(margins), layer.maxchunk)).encode('utf-8'))
+    masks = layer.masks()
+    for key in sorted(masks.keys()):
+        h.update(('%s %x\n' % (key, masks[key])).encode('utf-8'))
+    return h.hexdigest()
+
+
+class PredictionCache:
+    ''' Per-layer predictions for all words of a dictionary.
+
+    Predictions of a layer are stored as a list of per-word bitmasks (in dictionary order), keyed
+    by layer fingerprint. Result of a pattern set is computed by replaying cached layer predictions,
+    so only new or modified layers need to be applied to the dictionary.
+    '''
+
+    VERSION = 1
+
+    def __init__(self, fingerprint, layers=None):
+        self.fingerprint = fingerprint
+        self._layers = layers or {}  # layer fingerprint -> list of prediction masks
+
+    def __len__(self):
+        return len(self._layers)
+
+    @classmethod
+    def build(cls, dictionary, margins):
+        return cls(fingerprint(dictionary, margins))
+
+    def is_valid(self, dictionary, margins):
+        return self.fingerprint == fingerprint(dictionary, margins)
+
+    def predict(self, layer, dictionary, margins, index=None):
+        '''
+        Returns predictions of a layer for all dictionary words, as a list of bitmasks
+        '''
+        key = layer_fingerprint(layer, margins)
+        masks = self._layers.get(key)
+        if masks is None:
+            if index is not None and index.covers(layer):
+                predictions = index.predict_masks(layer, margins)
+                masks = [predictions.get(word_id, 0) for word_id in range(len(dictionary))]
+            else:
+                masks = [layer.predict_mask(word, margins) for word in dictionary.keys()]
+            self._layers[key] = masks
+        return masks
+
+    def retain(self, layers, margins):
+        '''
+        Drops cached predictions of all layers, except the given ones
+        '''
+        keep = set(layer_fingerprint(layer, margins) for layer in layers)
+        for key in list(self._layers.keys()):
+            if key not in keep:
+                del self._layers[key]
+
+    def evaluate(self, patternset, dictionary, margins, index=None, sinks=()):
+        '''
+        Same as PatternSet.evaluate, but computed from cached layer predictions
+        '''
+        layers = [self.predict(layer, dictionary, margins, index=index) for layer in patternset]
+
+        num_missed = 0
+        num_false = 0
+        for word_id, (word, hyphens) in enumerate(dictionary.mask_items()):
+            prediction = 0
+            for i, masks in enumerate(layers):
+                if (i & 1) == 0:
+                    prediction |= masks[word_id]
+                else:
+                    prediction &= ~masks[word_id]
+
+            missed = hyphens & ~prediction
+            false  = prediction & ~hyphens
+
+            if missed or false:
+                for sink in sinks:
+                    sink(word, to_set(hyphens), to_set(missed), to_set(false))
+                w = dictionary.weights[word]
+                num_missed += weighted_sum(missed, w)
+                num_false  += weighted_sum(false, w)
+
+        return num_missed, num_false
+
+    def save(self, filename):
+        with open(filename, 'wb') as f:
+            f.write(MAGIC)
+            f.write(zlib.compress(marshal.dumps((self.VERSION, self.fingerprint, self._layers))))
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise RuntimeError('Not a prediction cache file: %s' % filename)
+            version, fprint, layers = marshal.loads(zlib.decompress(f.read()))
+
+        if version != cls.VERSION:
+            raise RuntimeError('Incompatible prediction cache version: %s (expected %s)' % (version, cls.VERSION))
+
+        return cls(fprint, layers)
@@ -7,14 +7,54 @@ from datetime import datetime
 from patgen.patternset import PatternSet
 import pickle
 import os
+import struct
 from patgen.layer import Layer
 from patgen import stagger_range
+from patgen import parallel
+from patgen.ngram_index import NgramIndex
+from patgen.predictions import PredictionCache
+from patgen import journal
+
+
+MAGIC = b'PGPROJ01'
+SECTIONS = ('header', 'patternset', 'dictionary')
+
+
+def _write_section(f, data):
+    f.write(struct.pack('<Q', len(data)))
+    f.write(data)
+
+
+def _read_section(f):
+    size, = struct.unpack('<Q', f.read(8))
+    return f.read(size)
 
 
 class Project:
+    ''' Hyphenation project.
+
+    Project file is a sequence of independently readable sections: a small header (version, timestamps, 
+    margins, statistics, dictionary size and number of layers), the pattern set and the dictionary. 
+    Pattern set and dictionary are read lazily, on first access.
+
+    Commits append journal records to the file (see commit). Every record has the same three sections:
+    a header, pattern set changes and changed dictionary errors. Records are replayed on load.
+    '''
     
     VERSION = '2016/03/07'
 
+    # commit re-writes the whole project when journal grows bigger than this fraction of dictionary section
+    JOURNAL_RATIO = 1.0
+
+    # lazily loaded sections (see load)
+    _source = None  # (filename, section offsets of base and of every journal record, file size)
+    _dictionary = None
+    _dictionary_size = None
+    _patternset = None
+    _num_layers = None
+    _journal = ()  # headers of journal records: (modified, missed, false, total_hyphens, num_layers, description)
+    _base_layers = None  # pattern set state at last commit (see patgen.journal.snapshot)
+
     def __init__(self, dictionary, margins=None, total_hyphens=None):
         
         self.dictionary = dictionary
@@ -29,6 +69,12 @@ class Project:
         self.missed = self.total_hyphens
         self.false = 0
 
+        # optional n-gram index of the dictionary (stored in a separate file)
+        self.index = None
+
+        # optional cache of per-layer predictions (stored in a separate file)
+        self.predictions = None
+
     def __getstate__(self):
         return (
             self.VERSION, 
@@ -55,9 +101,66 @@ class Project:
             self.false
         ) = state
         
+        self.index = None
+        self.predictions = None
+
         if version != self.VERSION:
             raise RuntimeError('Incompatible version: %s (expected %s)' % (version, self.VERSION))
     
+    @property
+    def dictionary(self):
+        if self._dictionary is None and self._source is not None:
+            dictionary = self._load_section(0, 'dictionary')
+            for i in range(1, len(self._source[1])):
+                errors = self._load_section(i, 'dictionary')
+                if errors:
+                    dictionary.set_errors(errors)
+            dictionary.track_changes()
+            self._dictionary = dictionary
+        return self._dictionary
+
+    @dictionary.setter
+    def dictionary(self, dictionary):
+        self._dictionary = dictionary
+
+    @property
+    def patternset(self):
+        if self._patternset is None and self._source is not None:
+            patternset = self._load_section(0, 'patternset')
+            for i in range(1, len(self._source[1])):
+                changes = self._load_section(i, 'patternset')
+                if changes is not None:
+                    journal.apply_patternset_changes(patternset, changes)
+            self._base_layers = journal.snapshot(patternset)
+            self._patternset = patternset
+        return self._patternset
+
+    @patternset.setter
+    def patternset(self, patternset):
+        self._patternset = patternset
+
+    @property
+    def dictionary_size(self):
+        '''
+        Number of dictionary words. Does not load dictionary.
+        '''
+        if self._dictionary is None and self._dictionary_size is not None:
+            return self._dictionary_size
+        return len(self.dictionary)
+
+    @property
+    def journal(self):
+        '''
+        Headers of journal records: (modified, missed, false, total_hyphens, num_layers, description)
+        '''
+        return list(self._journal)
+
+    def _load_section(self, record, name):
+        filename, records, _ = self._source
+        with open(filename, 'rb') as f:
+            f.seek(records[record][name])
+            return pickle.loads(_read_section(f))
+
     @classmethod
     def load(cls, filename):
 
@@ -65,27 +168,260 @@ class Project:
             raise RuntimeError('Project file not found: %s' % filename)
         
         with open(filename, 'rb') as f:
-            return pickle.load(f)
+            if f.read(len(MAGIC)) != MAGIC:
+                f.seek(0)
+                return pickle.load(f)  # single-pickle project file
+
+            records = []  # section offsets of base and of every journal record
+            headers = []
+            file_size = os.fstat(f.fileno()).st_size
+            while f.tell() < file_size:
+                offsets = {}
+                for name in SECTIONS:
+                    offsets[name] = f.tell()
+                    data = f.read(8)
+                    if len(data) < 8:
+                        raise RuntimeError('Project file is truncated: %s' % filename)
+                    size, = struct.unpack('<Q', data)
+                    if name == 'header':
+                        headers.append(pickle.loads(f.read(size)))
+                    else:
+                        f.seek(size, os.SEEK_CUR)
+                offsets['end'] = f.tell()
+                records.append(offsets)
+
+            if not records or f.tell() != file_size:
+                raise RuntimeError('Project file is truncated: %s' % filename)
+
+        header = headers[0]
+        if len(header) == 8:
+            header += (None,)  # written before journal support: number of layers is not stored
+        version, created, modified, margins, total_hyphens, missed, false, dictionary_size, num_layers = header
+        if version != cls.VERSION:
+            raise RuntimeError('Incompatible version: %s (expected %s)' % (version, cls.VERSION))
+
+        project = cls.__new__(cls)
+        project.created = created
+        project.modified = modified
+        project.margins = margins
+        project.total_hyphens = total_hyphens
+        project.missed = missed
+        project.false = false
+        project.index = None
+        project.predictions = None
+        project._dictionary_size = dictionary_size
+        project._num_layers = num_layers
+        project._journal = headers[1:]
+        if project._journal:
+            project.modified, project.missed, project.false, project.total_hyphens, project._num_layers, _ = project._journal[-1]
+        project._source = (filename, records, file_size)
+        if project._num_layers is None:
+            project._num_layers = len(project.patternset)
+
+        return project
 
     def save(self, filename):
+        '''
+        Writes the whole project (without journal)
+        '''
+        header = (self.VERSION, self.created, datetime.now(), self.margins, 
+                  self.total_hyphens, self.missed, self.false, len(self.dictionary), len(self.patternset))
+
+        sections = [pickle.dumps(x, pickle.HIGHEST_PROTOCOL) for x in (header, self.patternset, self.dictionary)]
         
         with open(filename, 'wb') as f:
-            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+            offsets = {}
+            f.write(MAGIC)
+            for name, data in zip(SECTIONS, sections):
+                offsets[name] = f.tell()
+                _write_section(f, data)
+            offsets['end'] = f.tell()
+
+        self._source = (filename, [offsets], offsets['end'])
+        self._journal = []
+        self._num_layers = len(self.patternset)
+        self._base_layers = journal.snapshot(self.patternset)
+        self.dictionary.track_changes()
+
+    def commit(self, filename, description=''):
+        '''
+        Saves project. If project was loaded from (or last saved to) the same file, only changes made since then
+        are appended to the file, as a journal record: new and replaced layers, changed patterns and changed
+        dictionary errors. When journal grows too big (see JOURNAL_RATIO), the whole project is re-written.
+        '''
+        source = self._source
+        if (source is None or os.path.abspath(source[0]) != os.path.abspath(filename) 
+                or not os.path.exists(filename) or os.path.getsize(filename) != source[2]):
+            return self.save(filename)
+
+        changes = None
+        if self._patternset is not None:
+            changes = journal.patternset_changes(self._base_layers, self._patternset)
+            self._num_layers = len(self._patternset)
+        errors = self._dictionary.changed_errors() if self._dictionary is not None else None
+
+        header = (datetime.now(), self.missed, self.false, self.total_hyphens, self._num_layers, description)
+        sections = [pickle.dumps(x, pickle.HIGHEST_PROTOCOL) for x in (header, changes, errors)]
+
+        _, records, file_size = source
+        dictionary_size = records[0]['end'] - records[0]['dictionary']
+        if file_size - records[0]['end'] + sum(len(x) for x in sections) > dictionary_size * self.JOURNAL_RATIO:
+            return self.save(filename)  # consolidate
+
+        with open(filename, 'r+b') as f:
+            f.seek(file_size)
+            offsets = {}
+            for name, data in zip(SECTIONS, sections):
+                offsets[name] = f.tell()
+                _write_section(f, data)
+            offsets['end'] = f.tell()
 
-    def train_new_layer(self, patlen_range, selector):
+        self._source = (filename, records + [offsets], offsets['end'])
+        self._journal = list(self._journal) + [header]
+        self.modified = header[0]
+        if self._patternset is not None:
+            self._base_layers = journal.snapshot(self._patternset)
+        if self._dictionary is not None:
+            self._dictionary.track_changes()
+
+    @classmethod
+    def rollback(cls, filename, num_records=1):
+        '''
+        Drops last :num_records: journal records from project file
+        '''
+        project = cls.load(filename)
+        if num_records > len(project._journal):
+            raise RuntimeError('Project journal has only %s record(s)' % len(project._journal))
+
+        if num_records > 0:
+            _, records, _ = project._source
+            with open(filename, 'r+b') as f:
+                f.truncate(records[len(records) - num_records]['header'])
+
+    @staticmethod
+    def index_filename(filename):
+        return filename + '.ngrams'
+
+    def build_index(self, maxlen):
+        self.index = NgramIndex.build(self.dictionary, self.margins, maxlen)
+        return self.index
+
+    def save_index(self, filename):
+        self.index.save(self.index_filename(filename))
+
+    def load_index(self, filename):
+        '''
+        Loads n-gram index stored alongside the project file. Index is ignored if it
+        does not exist, or if it was built for a different dictionary or margins.
+
+        Returns True if index was loaded
+        '''
+        self.index = None
+
+        index_filename = self.index_filename(filename)
+        if not os.path.exists(index_filename):
+            return False
+
+        index = NgramIndex.load(index_filename)
+        if not index.is_valid(self.dictionary, self.margins):
+            return False
+
+        self.index = index
+        return True
+
+    @staticmethod
+    def predictions_filename(filename):
+        return filename + '.predictions'
+
+    def load_predictions(self, filename):
+        '''
+        Loads cache of per-layer predictions stored alongside the project file. If cache does not exist, 
+        or was built for a different dictionary or margins, starts a new (empty) one.
+
+        Returns number of cached layers
+        '''
+        self.predictions = None
+
+        predictions_filename = self.predictions_filename(filename)
+        if os.path.exists(predictions_filename):
+            predictions = PredictionCache.load(predictions_filename)
+            if predictions.is_valid(self.dictionary, self.margins):
+                self.predictions = predictions
+
+        if self.predictions is None:
+            self.predictions = PredictionCache.build(self.dictionary, self.margins)
+
+        return len(self.predictions)
+
+    def save_predictions(self, filename):
+        self.predictions.save(self.predictions_filename(filename))
+
+    def evaluate(self, dictionary, engine='automaton', jobs=1, sinks=()):
+        '''
+        Evaluates pattern set on a dictionary. If dictionary has the same words as the project
+        dictionary, and prediction cache is loaded, result is computed from cached predictions
+        (and only layers missing from the cache are applied to the dictionary).
+
+        Returns weighted totals of missed and false hyphens.
+        '''
+        if self.predictions is not None and self.predictions.is_valid(dictionary, self.margins):
+            index = self.index if dictionary is self.dictionary else None
+            return self.predictions.evaluate(self.patternset, dictionary, self.margins, index=index, sinks=sinks)
+
+        return self.patternset.evaluate(dictionary, self.margins, engine=engine, jobs=jobs, sinks=sinks)
+
+    def train_new_layer(self, patlen_range, selector, jobs=1, shards=1, quiet=False):
 
         inhibiting = len(self.patternset) & 1
     
         layer = Layer(patlen_range, selector, inhibiting)
-        self.patternset.append(layer)
         
-        for patlen in stagger_range(patlen_range.start, patlen_range.end + 1):
-            additions = layer.train(patlen, self.dictionary, self.margins)
-            print('Selected %s patterns of length %s' % (len(additions), patlen))
+        patlens = stagger_range(patlen_range.start, patlen_range.end + 1)
+        if jobs > 1 or shards > 1:
+            # dictionary state does not change while training a layer, hence
+            # every pattern length (and every dictionary shard) can be trained in a separate process
+            for patlen, additions in parallel.train_patterns(self.dictionary, self.margins, 
+                                                             inhibiting, selector, patlens, 
+                                                             jobs=jobs, shards=shards):
+                layer.update(additions)
+                if not quiet:
+                    print('Selected %s patterns of length %s' % (len(additions), patlen))
+        else:
+            for patlen in patlens:
+                additions = layer.train(patlen, self.dictionary, self.margins)
+                if not quiet:
+                    print('Selected %s patterns of length %s' % (len(additions), patlen))
     
-        # evaluate
-        missed, false = layer.apply_to_dictionary(inhibiting, self.dictionary, margins=self.margins)
+        return self.add_layer(layer)
+
+    def add_layer(self, layer):
+        '''
+        Appends trained layer to the pattern set and updates dictionary errors
+        '''
+        self.patternset.append(layer)
+
+        missed, false = layer.apply_to_dictionary(layer.inhibiting, self.dictionary, margins=self.margins, index=self.index)
         self.missed = missed
         self.false = false
         
         return layer
+
+    def sweep(self, patlen_range, selectors, jobs=1):
+        '''
+        Trains next layer with each of the selectors, computing pattern statistics only once.
+        Candidate layers are scored (in parallel if jobs > 1), but project is not changed.
+
+        Returns list of (layer, missed, false) - one for each selector
+        '''
+        inhibiting = len(self.patternset) & 1
+
+        layers = [Layer(patlen_range, selector, inhibiting) for selector in selectors]
+
+        patlens = stagger_range(patlen_range.start, patlen_range.end + 1)
+        for patlen, stats in parallel.collect_layer_statistics(self.dictionary, self.margins, inhibiting, patlens, jobs=jobs):
+            for layer in layers:
+                layer.update(stats.select(layer.selector))
+
+        scores = parallel.score_layers(self.dictionary, self.margins, layers, jobs=jobs, index=self.index)
+
+        return [(layer, missed, false) for layer, (missed, false) in zip(layers, scores)]
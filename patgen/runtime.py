@@ -0,0 +1,173 @@
+'''
+Created on Oct 18, 2026
+
+Compact binary runtime pattern file: everything needed to hyphenate words (compiled patterns,
+margins and exceptions), and nothing else. The reader only depends on the standard library,
+memory-maps the file and looks patterns up directly in the mapped bytes.
+
+File layout (all integers are little-endian):
+
+    header:   magic, version, left margin, right margin, maxchunk,
+              (offset, number of slots) of pattern table, (offset, number of slots) of exception table
+    tables:   open-addressing hash tables (crc32 of UTF-8 key, linear probing). Every slot is
+              (data offset, key length, value length), empty slots have zero key length.
+    data:     UTF-8 key immediately followed by its value.
+
+Pattern value is the level vector of a pattern key (see patgen.matcher.PatternTable), one byte per level.
+Exception value is a vector of the same shape with 1 at hyphen positions of an exception word.
+'''
+import mmap
+import struct
+import zlib
+
+
+MAGIC = b'PGRUNTM1'
+VERSION = 1
+
+HEADER = struct.Struct('<8sIIII' + 'II' + 'II')
+SLOT = struct.Struct('<IHH')
+
+
+def _num_slots(num_entries):
+    slots = 8
+    while slots < 2 * num_entries:
+        slots *= 2
+    return slots
+
+
+def _hash_table(entries, offset, data):
+    '''
+    Builds hash table of (key bytes, value bytes) entries. Keys and values are appended to :data:,
+    :offset: is the file offset of data[0].
+    '''
+    num_slots = _num_slots(len(entries))
+    slots = [None] * num_slots
+
+    for key, value in entries:
+        h = zlib.crc32(key) & (num_slots - 1)
+        while slots[h] is not None:
+            h = (h + 1) & (num_slots - 1)
+        slots[h] = (offset + len(data), len(key), len(value))
+        data.extend(key)
+        data.extend(value)
+
+    return b''.join(SLOT.pack(*(slot or (0, 0, 0))) for slot in slots)
+
+
+def write_runtime(filename, table, margins, exceptions):
+    '''
+    Writes runtime pattern file.
+
+    :table: is a mapping of pattern key to level vector (e.g. PatternTable), :exceptions: is a list of
+    (word, hyphens)
+    '''
+    patterns = [(key.encode('utf-8'), bytes(bytearray(vector))) for key, vector in sorted(table.items())]
+    words = []
+    for word, hyphens in exceptions:
+        vector = bytearray(len(word) + 1)
+        for i in hyphens:
+            vector[i] = 1
+        words.append((word.encode('utf-8'), bytes(vector)))
+
+    maxchunk = max([len(key) for key, _ in table.items()] + [0])
+
+    patterns_offset = HEADER.size
+    exceptions_offset = patterns_offset + SLOT.size * _num_slots(len(patterns))
+    data_offset = exceptions_offset + SLOT.size * _num_slots(len(words))
+
+    data = bytearray()
+    patterns_table = _hash_table(patterns, data_offset, data)
+    exceptions_table = _hash_table(words, data_offset, data)
+
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, margins[0], margins[1], maxchunk,
+                            patterns_offset, _num_slots(len(patterns)), 
+                            exceptions_offset, _num_slots(len(words))))
+        f.write(patterns_table)
+        f.write(exceptions_table)
+        f.write(data)
+
+
+class RuntimePatterns:
+    ''' Reader of runtime pattern files. Use as a context manager, or call close() when done.
+    '''
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, left, right, self.maxchunk, 
+         self._patterns, self._patterns_slots, 
+         self._exceptions, self._exceptions_slots) = HEADER.unpack_from(self._mm, 0)
+
+        if magic != MAGIC:
+            self.close()
+            raise RuntimeError('Not a runtime pattern file: %s' % filename)
+        if version != VERSION:
+            self.close()
+            raise RuntimeError('Incompatible runtime pattern file version: %s (expected %s)' % (version, VERSION))
+
+        self.margins = (left, right)
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _get(self, key, table, num_slots):
+        mm = self._mm
+        h = zlib.crc32(key) & (num_slots - 1)
+        while True:
+            offset, key_len, value_len = SLOT.unpack_from(mm, table + h * SLOT.size)
+            if key_len == 0:
+                return None
+            if key_len == len(key) and mm[offset:offset+key_len] == key:
+                return mm[offset+key_len:offset+key_len+value_len]
+            h = (h + 1) & (num_slots - 1)
+
+    def exception(self, word):
+        '''
+        Returns set of hyphen positions if word is an exception, None otherwise
+        '''
+        vector = self._get(word.encode('utf-8'), self._exceptions, self._exceptions_slots)
+        if vector is None:
+            return None
+        return set(i for i, level in enumerate(bytearray(vector)) if level)
+
+    def levels(self, word):
+        '''
+        Returns a mapping of hyphen index to the max level of patterns that hit it
+        '''
+        left, right = self.margins
+        right = len(word) - right
+
+        padded = '.' + word + '.'
+        data = padded.encode('utf-8')
+        offsets = [0]  # byte offset of every letter of the padded word
+        for c in padded:
+            offsets.append(offsets[-1] + len(c.encode('utf-8')))
+
+        levels = {}
+        for chunklen in range(1, min(self.maxchunk, len(padded)) + 1):
+            for start in range(0, len(padded) - chunklen + 1):
+                vector = self._get(data[offsets[start]:offsets[start+chunklen]], self._patterns, self._patterns_slots)
+                if vector is None:
+                    continue
+                for index, level in enumerate(bytearray(vector)):
+                    if level:
+                        index += start - 1
+                        if left <= index <= right and level > levels.get(index, 0):
+                            levels[index] = level
+
+        return levels
+
+    def hyphenate(self, word):
+        hyphens = self.exception(word)
+        if hyphens is not None:
+            return hyphens
+
+        return set(index for index, level in self.levels(word).items() if level & 1)
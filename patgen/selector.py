@@ -4,6 +4,7 @@ Created on Mar 7, 2016
 @author: mike
 '''
 import collections
+import itertools
 
 
 class Selector(collections.namedtuple('_Selector', ['good_weight', 'bad_weight', 'threshold'])):
@@ -17,6 +18,19 @@ class Selector(collections.namedtuple('_Selector', ['good_weight', 'bad_weight',
 
         return cls(*tuple(float(x) for x in parts))
     
+    @classmethod
+    def parse_grid(cls, grid):
+        '''
+        Parses grid of selectors, e.g. "1:1,2,4:5,10" gives 6 selectors, from 1:1:5 to 1:4:10
+        '''
+        parts = grid.split(':')
+        
+        if len(parts) != 3:
+            raise ValueError('selector grid format error: expect three comma-separated lists delimited with a colon, e.g. "1:1,2:5,10". Got: %s' % grid)
+
+        values = [[float(x) for x in part.split(',')] for part in parts]
+        return [cls(*x) for x in itertools.product(*values)]
+
     def select(self, num_good, num_bad):
         return num_good * self.good_weight - num_bad * self.bad_weight >= self.threshold
 
@@ -0,0 +1,241 @@
+'''
+Created on Oct 18, 2026
+
+Hyphenation service: answers HTTP requests on localhost or on a Unix socket.
+
+    POST /hyphenate   request body is a UTF-8 word list (one word per line), response body
+                      is the list of hyphenated words, same as output of "hyphenate" command
+    GET  /stats       request counters, throughput and latency percentiles (JSON)
+
+Words of concurrent requests are coalesced into batches, batches are hyphenated by a pool of workers.
+Requires Python 3.7+ (asyncio.get_running_loop), import this module lazily.
+'''
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import time
+from patgen import hyphenator
+
+
+class ServerStats:
+    ''' Request counters and latencies of the most recent requests '''
+
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, window=10000):
+        self.started = time.time()
+        self.requests = 0
+        self.words = 0
+        self.batches = 0
+        self.errors = 0
+        self._latencies = collections.deque(maxlen=window)
+
+    def record(self, latency, num_words):
+        self.requests += 1
+        self.words += num_words
+        self._latencies.append(latency)
+
+    def percentile(self, p):
+        if not self._latencies:
+            return 0.0
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(round(p / 100.0 * (len(latencies) - 1))))]
+
+    def report(self):
+        uptime = time.time() - self.started
+        report = collections.OrderedDict([
+            ('uptime', uptime),
+            ('requests', self.requests),
+            ('words', self.words),
+            ('batches', self.batches),
+            ('errors', self.errors),
+            ('requests_per_sec', self.requests / uptime if uptime else 0.0),
+            ('words_per_sec', self.words / uptime if uptime else 0.0),
+        ])
+        for p in self.PERCENTILES:
+            report['latency_p%s_ms' % p] = self.percentile(p) * 1000
+        return report
+
+
+class HyphenationServer:
+    ''' Hyphenates words of concurrent requests in batches.
+
+    Batch is started by the first waiting request and collects more requests for at most :batch_delay:
+    seconds, or until it has :batch_size: words. Up to 2*jobs batches are processed at the same time.
+    '''
+
+    def __init__(self, patternset, margins, jobs=1, batch_size=1000, batch_delay=0.002, engine='automaton', cache_size=0):
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.stats = ServerStats()
+
+        initargs = (patternset, margins, engine, cache_size)
+        if jobs > 1:
+            self._executor = concurrent.futures.ProcessPoolExecutor(jobs, initializer=hyphenator.init_hyphenation, initargs=initargs)
+        else:
+            hyphenator.init_hyphenation(*initargs)
+            self._executor = concurrent.futures.ThreadPoolExecutor(1)
+
+        self._max_batches = 2 * max(jobs, 1)
+        self._queue = None
+        self._batcher = None
+        self._servers = []
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        '''
+        Starts listening on a Unix socket :path:, or on TCP :host: and :port: if path is not given.
+        Returns asyncio server.
+        '''
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.ensure_future(self._run_batches())
+
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def hyphenate(self, words):
+        '''
+        Returns list of hyphenated words (formatted as dictionary words)
+        '''
+        if not words:
+            return []
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((words, future))
+        return await future
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self._max_batches)
+
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.batch_delay
+            while size < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            await slots.acquire()
+            asyncio.ensure_future(self._process(batch, slots))
+
+    async def _process(self, batch, slots):
+        try:
+            words = [word for request, _ in batch for word in request]
+            self.stats.batches += 1
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, hyphenator.hyphenate_words, words)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            offset = 0
+            for request, future in batch:
+                if not future.done():
+                    future.set_result(result[offset:offset+len(request)])
+                offset += len(request)
+        finally:
+            slots.release()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                parts = line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                if len(parts) != 3:
+                    status, payload, content_type = 400, b'Bad request\n', 'text/plain'
+                else:
+                    status, payload, content_type = await self._dispatch(parts[0], parts[1], body)
+
+                keep_alive = len(parts) == 3 and parts[2] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                writer.write(('HTTP/1.1 %s %s\r\nContent-Type: %s; charset=utf-8\r\nContent-Length: %s\r\nConnection: %s\r\n\r\n' % (
+                    status, _REASONS[status], content_type, len(payload), 'keep-alive' if keep_alive else 'close')).encode('latin-1'))
+                writer.write(payload)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if method == 'POST' and path == '/hyphenate':
+            start = time.time()
+            try:
+                words = [line.strip() for line in body.decode('utf-8').splitlines()]
+                words = [word for word in words if word]
+                result = await self.hyphenate(words)
+            except Exception as e:
+                self.stats.errors += 1
+                return 500, ('%s\n' % e).encode('utf-8'), 'text/plain'
+            self.stats.record(time.time() - start, len(words))
+            return 200, ''.join(word + '\n' for word in result).encode('utf-8'), 'text/plain'
+
+        if method == 'GET' and path == '/stats':
+            return 200, (json.dumps(self.stats.report(), indent=2) + '\n').encode('utf-8'), 'application/json'
+
+        return 404, b'Not found\n', 'text/plain'
+
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+
+
+def serve(patternset, margins, host='127.0.0.1', port=8080, path=None, **kw):
+    '''
+    Runs hyphenation server until interrupted. Returns final statistics report.
+    '''
+    server = HyphenationServer(patternset, margins, **kw)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(server.start(host=host, port=port, path=path))
+        if path is not None:
+            print('Listening on Unix socket', path)
+        else:
+            print('Listening on http://%s:%s' % (host, port))
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        loop.run_until_complete(server.close())
+    finally:
+        loop.close()
+        if path is not None and os.path.exists(path):
+            os.unlink(path)
+
+    return server.stats.report()
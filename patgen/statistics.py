@@ -0,0 +1,137 @@
+'''
+Created on Oct 18, 2026
+'''
+import collections
+
+try:
+    from patgen import numpy_backend
+except ImportError:
+    numpy_backend = None
+
+
+BACKENDS = ('python', 'numpy')
+
+_backend = 'python'
+
+
+def set_backend(name):
+    '''
+    Selects implementation used by collect_statistics: "python" or "numpy".
+
+    If NumPy is not installed, "numpy" silently falls back to "python".
+    Returns the name of the backend actually in use.
+    '''
+    global _backend
+
+    if name not in BACKENDS:
+        raise ValueError('unknown statistics backend: %s (expected one of: %s)' % (name, ', '.join(BACKENDS)))
+
+    if name == 'numpy' and numpy_backend is None:
+        name = 'python'
+
+    _backend = name
+    return _backend
+
+
+def get_backend():
+    return _backend
+
+
+class PatternStatistics:
+    ''' Performance counts of candidate patterns.
+    Maps (chunk, hyphen position) to weighted number of "good" and "bad" hits.
+    '''
+
+    def __init__(self):
+        self.good = collections.defaultdict(int)
+        self.bad  = collections.defaultdict(int)
+
+    def __len__(self):
+        return len(set(self.good.keys()) | set(self.bad.keys()))
+
+    def update(self, other):
+        '''
+        Adds counts from another PatternStatistics object
+        '''
+        for key, val in other.good.items():
+            self.good[key] += val
+        for key, val in other.bad.items():
+            self.bad[key] += val
+
+    def keys(self):
+        return sorted(set(self.good.keys()) | set(self.bad.keys()))
+
+    def items(self):
+        '''
+        Yields (chunk, position, num_good, num_bad) tuples, sorted by chunk and position
+        '''
+        for ch, position in self.keys():
+            yield ch, position, self.good.get((ch, position), 0), self.bad.get((ch, position), 0)
+
+    def position(self, hyphen_position):
+        '''
+        Returns statistics for a single hyphen position in the same format as
+        Dictionary.generate_pattern_statistics
+        '''
+        return [(ch, num_good, num_bad) for ch, position, num_good, num_bad in self.items() if position == hyphen_position]
+
+    def select(self, selector):
+        '''
+        Returns patterns (a mapping of chunk to set of hyphen positions) accepted by the selector
+        '''
+        patterns = collections.defaultdict(set)
+        for ch, position, num_good, num_bad in self.items():
+            if selector.select(num_good, num_bad):
+                patterns[ch].add(position)
+
+        return patterns
+
+
+def collect_statistics(records, inhibiting, patt_len, margins):
+    '''
+    Computes pattern statistics for all hyphen positions 0..patt_len in a single sweep over words.
+
+    records is an iterable of (word, hyphens, missed, false, weights) tuples, with hyphens, missed
+    and false positions as bitmasks (see Dictionary.mask_records).
+
+    A chunk at offset "start" of the padded word covers hyphen index "start + position - 1".
+    Only indices that honor hyphenation margins are counted (this is exactly what Chunker does
+    for a single position).
+    '''
+    if _backend == 'numpy':
+        records = list(records)
+        stats = PatternStatistics()
+        if numpy_backend.collect_statistics(records, inhibiting, patt_len, margins, stats):
+            return stats
+
+    return collect_statistics_python(records, inhibiting, patt_len, margins)
+
+
+def collect_statistics_python(records, inhibiting, patt_len, margins):
+    stats = PatternStatistics()
+    good = stats.good
+    bad  = stats.bad
+
+    for word, hyphens, missed, false, weight in records:
+        padded = '.' + word + '.'
+        maxpos = min(patt_len, len(word))
+        lo = margins.left + 1
+        hi = len(word) - margins.right + 2
+
+        for start in range(0, len(padded) - patt_len + 1):
+            ch = padded[start:start+patt_len]
+            for position in range(max(0, lo - start), min(maxpos + 1, hi - start)):
+                index = start + position - 1
+                w = weight[index]
+                if not inhibiting:
+                    if (missed >> index) & 1:
+                        good[ch, position] += w
+                    elif not (hyphens >> index) & 1:
+                        bad[ch, position] += w
+                else:
+                    if (false >> index) & 1:
+                        good[ch, position] += w
+                    elif (hyphens >> index) & 1 and not (missed >> index) & 1:
+                        bad[ch, position] += w
+
+    return stats
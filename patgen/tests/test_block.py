@@ -0,0 +1,26 @@
+'''
+Created on Oct 18, 2026
+'''
+import unittest
+from patgen.block import encode_block, decode_block
+from patgen.dictionary import Dictionary
+
+
+class TestBlock(unittest.TestCase):
+    
+    def test_roundtrip(self):
+        
+        dictionary = Dictionary.from_string('''
+        hy-phe-2n-a-tion
+        wo.rd
+        3pa*t-tern
+        ''')
+        
+        records = list(dictionary.mask_records())
+        expected = [(word, h, m, f, tuple(w[i] for i in range(len(word) + 1))) for word, h, m, f, w in records]
+        
+        self.assertEqual(list(decode_block(encode_block(records))), expected)
+
+    def test_empty(self):
+        
+        self.assertEqual(list(decode_block(encode_block([]))), [])
@@ -0,0 +1,49 @@
+'''
+Created on Oct 18, 2026
+'''
+import unittest
+from patgen.cache import WordCache
+from patgen.layer import Layer
+from patgen.margins import Margins
+from patgen.patternset import PatternSet
+from patgen.range import Range
+
+
+class TestCache(unittest.TestCase):
+    
+    def test_lru(self):
+        
+        cache = WordCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+
+        cache.put('c', 3)  # evicts 'b', least recently used
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_invalidation(self):
+        
+        pset = PatternSet()
+        pset.set_cache_size(10)
+        pset.append(Layer(Range(1, 3), None, False))
+        pset[0].update({'ab': {1}})
+        
+        margins = Margins(1,1)
+        self.assertEqual(pset.hyphenate('abc', margins), {1})
+        self.assertEqual(pset.hyphenate('abc', margins), {1})
+        self.assertEqual((pset.cache.hits, pset.cache.misses), (1, 1))
+
+        pset.set_pattern_control('bc', {1: 1})
+        self.assertEqual(pset.hyphenate('abc', margins), {1, 2})
+
+        pset.append(Layer(Range(1, 3), None, True))
+        pset[1].update({'c': {0}})
+        self.assertEqual(pset.hyphenate('abc', margins), {1})
+        self.assertEqual(pset.hyphenate('abc', Margins(2,1)), set())
+
+        pset[1] = Layer(Range(1, 3), None, True)
+        self.assertEqual(pset.hyphenate('abc', margins), {1, 2})
+        self.assertEqual(pset.cache.hits, 1)
@@ -3,9 +3,16 @@ Created on Mar 10, 2016
 
 @author: mike
 '''
+import copy
 import unittest
 from patgen.patternset import PatternSet
 from patgen.layer import Layer
+from patgen.dictionary import Dictionary
+from patgen.project import Project
+from patgen.suffix_array import SuffixArray
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
 
 
 class TestCompact(unittest.TestCase):
@@ -20,4 +27,46 @@ class TestCompact(unittest.TestCase):
         pset.compact()
         
         patterns = set(pset.pattern_strings())
-        self.assertEqual(len(patterns), 1)
\ No newline at end of file
+        self.assertEqual(len(patterns), 1)
+    def test_duplicate_positions(self):
+        
+        pset = PatternSet()
+        for inhibiting in (False, True, False):
+            pset.append(Layer(None, None, inhibiting))
+        
+        pset[0].update({'ab': {1}, 'cd': {0, 1}})
+        pset[2].update({'ab': {1}, 'cd': {2}})
+        
+        pset.compact()
+        
+        self.assertEqual(sorted(pset.pattern_strings()), ['1c1d3', 'a3b'])
+        self.assertEqual([len(layer) for layer in pset], [1, 0, 2])
+
+    def test_renormalize(self):
+        
+        project = Project(Dictionary.from_string(DICTIONARY))
+        for selector in ('1:1:1', '1:1:1', '1:2:1', '1:1:1'):
+            project.train_new_layer(Range.parse('1-4'), Selector.parse(selector))
+
+        # layers trained with overlapping ranges often select the same (key, position) again
+        pset = project.patternset
+        pset[2].update(dict((key, pset[0][key]) for key in list(pset[0].keys())[::2]))
+        expected = copy.deepcopy(pset)
+
+        pset.compact()
+
+        # compaction as it was done before: cancel controls, then re-write every key
+        patterns = dict((key, expected.get_pattern_control(key)) for key in expected.keys())
+        suffix_array = SuffixArray.build(patterns.keys())
+        for key, control in patterns.items():
+            for lkey, offset in suffix_array.superstrings(key):
+                if lkey != key:
+                    lcontrol = patterns[lkey]
+                    for i, val in control.items():
+                        if 0 < lcontrol.get(offset + i, 0) <= val:
+                            del lcontrol[offset + i]
+        for key, control in patterns.items():
+            expected.set_pattern_control(key, control)
+
+        self.assertEqual([len(layer) for layer in pset], [len(layer) for layer in expected])
+        self.assertEqual(list(pset.pattern_strings()), list(expected.pattern_strings()))
@@ -0,0 +1,82 @@
+'''
+Created on Oct 18, 2026
+'''
+import pickle
+import unittest
+from patgen.dictionary import Dictionary
+from patgen.compact_dictionary import CompactDictionary
+from patgen.project import Project
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+
+
+WORDS = '''
+hy-phe-2n-a-tion
+wo.rd
+3pa*t-tern
+'''
+
+
+class TestCompactDictionary(unittest.TestCase):
+    
+    def test_views(self):
+        
+        dictionary = Dictionary.from_string(WORDS)
+        compact = CompactDictionary.from_string(WORDS)
+        
+        self.assertEqual(len(compact.keys()), 3)
+        self.assertEqual(list(compact.keys()), list(dictionary.keys()))
+        self.assertEqual(list(compact.items()), list(dictionary.items()))
+        self.assertEqual(list(compact.records()), list(dictionary.records()))
+
+        for word in dictionary.keys():
+            self.assertEqual(compact[word], dictionary[word])
+            self.assertEqual(compact.missed[word], dictionary.missed[word])
+            self.assertEqual(compact.false[word], dictionary.false[word])
+            self.assertEqual(compact.weights[word], dictionary.weights[word])
+
+        self.assertNotIn('words', compact.keys())
+        self.assertRaises(KeyError, lambda: compact['words'])
+        
+        compact.missed['word'] = {1, 2}
+        self.assertEqual(compact.missed['word'], {1, 2})
+
+        self.assertEqual(compact.compute_total_hyphens(), dictionary.compute_total_hyphens())
+        self.assertEqual(compact.compute_margins(), dictionary.compute_margins())
+
+    def test_pickle(self):
+
+        compact = CompactDictionary.from_string(WORDS)
+        
+        restored = pickle.loads(pickle.dumps(compact, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(list(restored.records()), list(compact.records()))
+        self.assertEqual(restored.weights['pattern'], compact.weights['pattern'])
+
+    def test_training(self):
+
+        rng = Range.parse('1-3')
+        selector = Selector.parse('1:1:1')
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        compact = Project(CompactDictionary.from_string(DICTIONARY))
+
+        for _ in range(2):
+            project.train_new_layer(rng, selector)
+            compact.train_new_layer(rng, selector)
+        
+        self.assertEqual(list(compact.patternset.pattern_strings()), list(project.patternset.pattern_strings()))
+        self.assertEqual((compact.missed, compact.false), (project.missed, project.false))
+        self.assertEqual(list(compact.dictionary.records()), list(project.dictionary.records()))
+
+    def test_weighted_errors(self):
+
+        dictionary = Dictionary.from_string(WORDS)
+        compact = CompactDictionary.from_string(WORDS)
+        compact.false['pattern'] = {1, 2}
+        dictionary.false['pattern'] = {1, 2}
+
+        for word in dictionary.keys():
+            self.assertEqual(compact.weighted_errors(word), dictionary.weighted_errors(word))
+        self.assertEqual(compact.weighted_errors('word'), (1, 0))
+        self.assertEqual(compact.weighted_errors('pattern'), (0, 6))
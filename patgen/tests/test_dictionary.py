@@ -40,3 +40,68 @@ class TestDictionary(unittest.TestCase):
         ''')
         x = set(dictionary.generate_pattern_statistics(False, 3, 1, Margins(1,1)))
         self.assertEqual(x, {('wor', 0, 1), ('ord', 0, 1), ('rd.', 0, 1)})
+
+    def test_load(self):
+
+        text = '''
+        # comment
+        hy-phe-2n-a-tion
+        3pa*t-tern
+
+        wo.rd
+        Up-per
+        '''
+        lines = text.split('\n')
+        expected = Dictionary.from_string(text)
+
+        for jobs in (1, 2):
+            batches = [lines[i:i+2] for i in range(0, len(lines), 2)]
+            dictionary = Dictionary.from_batches(batches, jobs=jobs)
+            self.assertEqual(list(dictionary.records()), list(expected.records()))
+            self.assertEqual(list(dictionary.keys()), ['hyphenation', 'pattern', 'word', 'upper'])
+
+            self.assertEqual(dictionary.compute_total_hyphens(), 7)
+            self.assertEqual(dictionary.compute_margins(), Margins(2, 2))
+            dictionary._stats = None
+            self.assertEqual(dictionary.compute_total_hyphens(), 7)
+            self.assertEqual(dictionary.compute_margins(), Margins(2, 2))
+
+        dictionary = Dictionary.from_string('ab-c\na-bc\n')
+        self.assertIsNone(dictionary._stats)  # "abc" is replaced
+        self.assertEqual(dictionary.compute_total_hyphens(), 1)
+        self.assertEqual(dictionary.compute_margins(), Margins(1, 2))
+
+    def test_masks(self):
+
+        dictionary = Dictionary.from_string('''
+        hy-phe-2n-a-tion
+        wo.rd
+        ''')
+
+        self.assertEqual(list(dictionary.mask_items()), [('hyphenation', 0b11100100), ('word', 0b100)])
+        self.assertEqual(dictionary['word'], {2})
+        self.assertEqual(dictionary.missed['word'], {2})
+        self.assertEqual(dictionary.error_totals(), (1, 0))
+
+        totals = dictionary.update_error_masks(lambda word_id, word, hyphens, missed, false: (hyphens, 0b1000), word_ids=[0])
+        self.assertEqual(totals, (1 + 5, 1))
+        self.assertEqual(dictionary.missed['hyphenation'], {2, 5, 6, 7})
+        self.assertEqual(dictionary.false['hyphenation'], {3})
+
+        state = dictionary.__getstate__()
+        state['_missed'] = {'hyphenation': {2}, 'word': set()}  # pre-bitmask format
+        restored = Dictionary.__new__(Dictionary)
+        restored.__setstate__(state)
+        self.assertEqual(restored.missed['hyphenation'], {2})
+        self.assertEqual(restored.missed['word'], set())
+
+    def test_mask_views(self):
+
+        dictionary = Dictionary.from_string('wo.rd')
+
+        with self.assertRaises(AttributeError):
+            dictionary.missed['word'].add(1)  # views are read-only
+
+        dictionary.missed['word'] = {1, 2}
+        self.assertEqual(dictionary.missed['word'], {1, 2})
+        self.assertEqual(dictionary.error_totals(), (2, 0))
@@ -0,0 +1,59 @@
+'''
+Created on Oct 18, 2026
+'''
+import codecs
+import io
+import os
+import tempfile
+import unittest
+from patgen.dictionary import Dictionary, format_dictionary_word
+from patgen.hyphenator import read_batches, hyphenate_stream
+from patgen.project import Project
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+
+
+TEXT = u'  hello\r\nмир\rworld\n\n über \x0bend\r'
+
+
+class TestHyphenator(unittest.TestCase):
+    
+    def test_read_batches(self):
+
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            with codecs.open(filename, 'w', 'utf-8') as f:
+                f.write(TEXT)
+
+            with codecs.open(filename, 'r', 'utf-8') as f:
+                expected = [line.strip() for line in f if line.strip()]
+        finally:
+            os.unlink(filename)
+
+        data = TEXT.encode('utf-8')
+        for chunk_size in (1, 2, 3, 7, 1000):
+            batches = list(read_batches(io.BytesIO(data), 2, chunk_size=chunk_size))
+            self.assertTrue(all(len(batch) <= 2 for batch in batches))
+            self.assertEqual([word for batch in batches for word in batch], expected)
+
+    def test_stream(self):
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        for _ in range(2):
+            project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+
+        words = list(project.dictionary.keys()) * 3
+        infile = io.BytesIO(u'\n'.join(words).encode('utf-8'))
+        expected = u''.join(format_dictionary_word(word, project.patternset.hyphenate(word, project.margins)) + u'\n' 
+                            for word in words).encode('utf-8')
+
+        for jobs in (1, 2):
+            infile.seek(0)
+            out = io.BytesIO()
+            num_words, hits, misses = hyphenate_stream(project.patternset, project.margins, infile, out, 
+                                                       jobs=jobs, batch_size=4, cache_size=100)
+            self.assertEqual(out.getvalue(), expected)
+            self.assertEqual(num_words, len(words))
+            self.assertEqual(hits + misses, len(words))
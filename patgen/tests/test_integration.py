@@ -5,16 +5,14 @@ Created on Mar 7, 2016
 '''
 import unittest
 from patgen.dictionary import Dictionary
+from patgen.compact_dictionary import CompactDictionary
 from patgen.project import Project
 from patgen.range import Range
 from patgen.selector import Selector
+from patgen import parallel
 
 
-class TestIntegration(unittest.TestCase):
-    
-    def test(self):
-
-        dictionary = Dictionary.from_string('''
+DICTIONARY = '''
             lo-rem
             ip-sum
             do-l-or
@@ -28,7 +26,14 @@ class TestIntegration(unittest.TestCase):
             di-am
             eg-et
             bi-b-en-d-um
-            ''')
+            '''
+
+
+class TestIntegration(unittest.TestCase):
+    
+    def test(self):
+
+        dictionary = Dictionary.from_string(DICTIONARY)
 
         project = Project(dictionary)
 
@@ -107,4 +112,79 @@ class TestIntegration(unittest.TestCase):
             'u1i',
             'u1l1',
             '1um'
-        ])
\ No newline at end of file
+        ])
+
+    def test_parallel(self):
+        
+        rng = Range.parse('1-3')
+        selector = Selector.parse('1:1:1')
+
+        serial = Project(Dictionary.from_string(DICTIONARY))
+        parallel_project = Project(Dictionary.from_string(DICTIONARY))
+        
+        for _ in range(2):
+            serial.train_new_layer(rng, selector)
+            parallel_project.train_new_layer(rng, selector, jobs=2)
+        
+        self.assertEqual(list(parallel_project.patternset.pattern_strings()), list(serial.patternset.pattern_strings()))
+        self.assertEqual((parallel_project.missed, parallel_project.false), (serial.missed, serial.false))
+
+    def test_parallel_evaluate(self):
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        project.train_new_layer(Range.parse('1-3'), Selector.parse('1:1:1'))
+
+        errors = list(project.patternset.errors(project.dictionary, project.margins))
+        self.assertTrue(errors)
+        self.assertEqual(list(project.patternset.errors(project.dictionary, project.margins, jobs=2)), errors)
+        self.assertEqual(project.patternset.evaluate(project.dictionary, project.margins, jobs=2), (project.missed, project.false))
+
+        for jobs in (1, 2):
+            collected = []
+            totals = project.patternset.evaluate(project.dictionary, project.margins, jobs=jobs, 
+                                                 sinks=[lambda *error: collected.append(error)])
+            self.assertEqual(totals, (project.missed, project.false))
+            self.assertEqual(collected, errors)
+
+    def test_sweep(self):
+        
+        rng = Range.parse('1-3')
+        selectors = Selector.parse_grid('1:1,2:1,3')
+        self.assertEqual(len(selectors), 4)
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        candidates = project.sweep(rng, selectors, jobs=2)
+        self.assertEqual(len(project.patternset), 0)
+
+        for layer, missed, false in candidates:
+            trained = Project(Dictionary.from_string(DICTIONARY))
+            trained.train_new_layer(rng, layer.selector)
+            
+            self.assertEqual((missed, false), (trained.missed, trained.false))
+            self.assertEqual(dict(layer.items()), dict(trained.patternset[0].items()))
+        
+        project.add_layer(candidates[0][0])
+        self.assertEqual((project.missed, project.false), candidates[0][1:])
+
+    def test_search(self):
+
+        candidates = [
+            ('a', [{'range': '1-2', 'selector': '1:1:1'}, {'range': '1-2', 'selector': '1:1:1'}]),
+            ('b', [{'range': '1-3', 'selector': '1:2:3'}]),
+            ('c', [{'range': '1-2', 'selector': '1:1:1'}, {'range': '1-2', 'selector': '1:1:1'}]),
+        ]
+        
+        for cls in (Dictionary, CompactDictionary):
+            for jobs in (1, 2):  # with one job, all candidates are trained on the same copy of the project
+                project = Project(cls.from_string(DICTIONARY))
+                results = list(parallel.search_candidates(project, candidates, jobs=jobs))
+                self.assertEqual(len(project.patternset), 0)
+                self.assertEqual([x[0] for x in results], ['a', 'b', 'c'])
+                
+                for (name, specs), (_, missed, false, layers, _) in zip(candidates, results):
+                    trained = Project(cls.from_string(DICTIONARY))
+                    for params in specs:
+                        trained.train_new_layer(Range.parse(params['range']), Selector.parse(params['selector']))
+                    
+                    self.assertEqual((missed, false), (trained.missed, trained.false))
+                    self.assertEqual([dict(x.items()) for x in layers], [dict(x.items()) for x in trained.patternset])
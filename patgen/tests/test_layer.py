@@ -0,0 +1,65 @@
+'''
+Created on Oct 18, 2026
+'''
+import collections
+import pickle
+import unittest
+from patgen.layer import Layer
+from patgen.margins import Margins
+from patgen.range import Range
+
+
+class TestLayer(unittest.TestCase):
+    
+    def test_storage(self):
+
+        layer = Layer(Range(1, 3), None, False)
+        layer.update({'ab': {1, 2}, 'c': set()})
+
+        self.assertEqual(dict(layer.items()), {'ab': {1, 2}})
+        self.assertEqual(layer.masks(), {'ab': 0b110})
+        self.assertEqual(layer.get('xy'), None)
+        self.assertNotIn('xy', layer)
+        with self.assertRaises(KeyError):
+            layer['xy']
+        self.assertEqual(len(layer), 1)
+        self.assertEqual(layer.compute_num_patterns(), 2)
+
+        layer['ab'] = set()
+        self.assertEqual(len(layer), 0)
+
+    def test_old_pickle(self):
+
+        layer = Layer(Range(1, 3), None, False)
+        layer.__dict__['_data'] = collections.defaultdict(set, {'ab': {1}, 'bc': set()})  # pre-bitmask format
+
+        layer = pickle.loads(pickle.dumps(layer))
+        self.assertEqual(layer.masks(), {'ab': 0b10})
+        self.assertEqual(layer.predict('abc', Margins(1, 1)), {1})
+
+    def test_predict_mask(self):
+
+        def predict(data, maxchunk, word, margins):
+            # set-based implementation, before layers were stored as bitmasks
+            word = '.' + word + '.'
+            prediction = set()
+            for chunklen in range(1, maxchunk + 1):
+                for start in range(0, len(word) - chunklen + 1):
+                    for index in data.get(word[start: start+chunklen], ()):
+                        if start + index > margins.left and start + index <= len(word) - 1 - margins.right:
+                            prediction.add(index + start - 1)
+            return prediction
+
+        patterns = {'.a': {1}, 'bc': {0, 1, 2}, 'c.': {0}, 'xyz': {2}}
+        layer = Layer(Range(1, 3), None, False)
+        layer.update(patterns)
+
+        for word in ('abc', 'abcbc', 'a', 'bcxyz'):
+            for margins in (Margins(1, 1), Margins(2, 1), Margins(1, 3)):
+                expected = predict(patterns, 3, word, margins)
+                self.assertEqual(layer.predict_mask(word, margins), sum(1 << i for i in expected))
+
+        self.assertEqual(layer.predict_mask('abcbc', Margins(1, 1)), 0b11110)
+        self.assertEqual(layer.predict_mask('bcxyz', Margins(1, 1)), 0b10110)
+        self.assertEqual(layer.predict_mask('abc', Margins(2, 1)), 0b100)
+        self.assertEqual(layer.predict_mask('a', Margins(1, 1)), 0)
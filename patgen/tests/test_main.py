@@ -0,0 +1,87 @@
+'''
+Created on Oct 18, 2026
+'''
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from patgen import main
+from patgen.dictionary import Dictionary
+from patgen.project import Project
+from patgen.tests.test_integration import DICTIONARY
+
+
+SPECS = [
+    {'range': '1-2', 'selector': '1:1:1'},
+    {'range': '1-3', 'selector': '1:2:1'},
+    {'range': '2-3', 'selector': '1:1:2'},
+]
+
+
+class TestBatchtrain(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+        self.specs = os.path.join(self.tmpdir, 'specs.py')
+        self.write_specs(SPECS)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_specs(self, specs):
+        with open(self.specs, 'w') as f:
+            f.write('SPECS = %r\n' % (specs,))
+
+    def new_project(self, name):
+        filename = os.path.join(self.tmpdir, name)
+        Project(Dictionary.from_string(DICTIONARY)).save(filename)
+        return filename
+
+    def run_command(self, func, project, **kw):
+        args = argparse.Namespace(project=project, jobs=1, shards=1, backend='python', **kw)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(args)
+
+    def train_sequential(self, specs):
+        filename = self.new_project('sequential-%s' % len(specs))
+        for params in specs:
+            self.run_command(main.main_train, filename, commit=True, **params)
+        return Project.load(filename)
+
+    def assertSameProject(self, project, expected):
+        self.assertEqual(len(project.patternset), len(expected.patternset))
+        self.assertEqual(list(project.patternset.pattern_strings()), list(expected.patternset.pattern_strings()))
+        self.assertEqual((project.missed, project.false), (expected.missed, expected.false))
+        self.assertEqual(list(project.dictionary.records()), list(expected.dictionary.records()))
+
+    def test_batchtrain(self):
+
+        expected = self.train_sequential(SPECS)
+
+        for checkpoint in (0, 1):
+            filename = self.new_project('batch-%s' % checkpoint)
+            result = self.run_command(main.main_batchtrain, filename, specs=self.specs, checkpoint=checkpoint, commit_best=False)
+            self.assertEqual(result, 0)
+
+            self.assertSameProject(Project.load(filename), expected)
+
+    def test_checkpoint(self):
+
+        expected = self.train_sequential(SPECS[:2])
+
+        # third level fails: levels trained before the last checkpoint are kept in the project file
+        self.write_specs(SPECS[:2] + [{'range': '2-3', 'selector': '1:1'}])
+
+        filename = self.new_project('batch')
+        self.assertRaises(ValueError, self.run_command, main.main_batchtrain, filename, specs=self.specs, checkpoint=2, commit_best=False)
+
+        self.assertSameProject(Project.load(filename), expected)
+
+        # without checkpoints, nothing is saved
+        filename = self.new_project('batch-nocheckpoint')
+        self.assertRaises(ValueError, self.run_command, main.main_batchtrain, filename, specs=self.specs, checkpoint=0, commit_best=False)
+        self.assertEqual(len(Project.load(filename).patternset), 0)
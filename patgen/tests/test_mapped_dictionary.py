@@ -0,0 +1,89 @@
+'''
+Created on Oct 18, 2026
+'''
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from patgen.dictionary import Dictionary
+from patgen.mapped_dictionary import MappedDictionary
+from patgen.project import Project
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+from patgen.tests.test_compact_dictionary import WORDS
+
+
+class TestMappedDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_views(self):
+
+        dictionary = Dictionary.from_string(WORDS)
+        mapped = MappedDictionary.from_dictionary(dictionary, os.path.join(self.tmpdir, 'words.pgd'))
+
+        self.assertEqual(len(mapped), 3)
+        self.assertEqual(list(mapped.keys()), list(dictionary.keys()))
+        self.assertEqual(list(mapped.items()), list(dictionary.items()))
+        self.assertEqual(list(mapped.records()), list(dictionary.records()))
+
+        for word in dictionary.keys():
+            self.assertEqual(mapped[word], dictionary[word])
+            self.assertEqual(mapped.weights[word], dictionary.weights[word])
+
+        self.assertNotIn('words', mapped.keys())
+        self.assertRaises(KeyError, lambda: mapped['words'])
+        self.assertRaises(TypeError, mapped.add, 'words', set(), set(), set(), {0: 1})
+
+        mapped.missed['word'] = {1, 2}
+        self.assertEqual(mapped.missed['word'], {1, 2})
+        self.assertEqual(MappedDictionary(mapped.filename).missed['word'], dictionary.missed['word'])  # store is not modified
+
+        self.assertEqual(mapped.compute_total_hyphens(), dictionary.compute_total_hyphens())
+        self.assertEqual(mapped.compute_margins(), dictionary.compute_margins())
+
+    def test_convert(self):
+
+        text = os.path.join(self.tmpdir, 'words.txt')
+        store = os.path.join(self.tmpdir, 'words.pgd')
+
+        Dictionary.from_string(WORDS).save(text)
+        MappedDictionary.from_dictionary(Dictionary.load(text), store)
+
+        mapped = Dictionary.load(store)
+        self.assertIsInstance(mapped, MappedDictionary)
+
+        mapped.save(os.path.join(self.tmpdir, 'copy.txt'))
+        with open(text, 'rb') as f1, open(os.path.join(self.tmpdir, 'copy.txt'), 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+    def test_training(self):
+
+        rng = Range.parse('1-3')
+        selector = Selector.parse('1:1:1')
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        mapped = Project(MappedDictionary.from_dictionary(Dictionary.from_string(DICTIONARY), os.path.join(self.tmpdir, 'dict.pgd')))
+
+        for _ in range(2):
+            project.train_new_layer(rng, selector)
+            mapped.train_new_layer(rng, selector, jobs=2)
+
+        self.assertEqual(list(mapped.patternset.pattern_strings()), list(project.patternset.pattern_strings()))
+        self.assertEqual((mapped.missed, mapped.false), (project.missed, project.false))
+        self.assertEqual(list(mapped.dictionary.records()), list(project.dictionary.records()))
+
+        restored = pickle.loads(pickle.dumps(mapped.dictionary, pickle.HIGHEST_PROTOCOL))
+        self.assertIsInstance(restored, MappedDictionary)
+        self.assertEqual(list(restored.records()), list(project.dictionary.records()))
+        self.assertEqual(restored.error_totals(), (project.missed, project.false))
+
+        filename = os.path.join(self.tmpdir, 'project.pgp')
+        mapped.save(filename)
+        self.assertEqual(list(Project.load(filename).dictionary.records()), list(project.dictionary.records()))
@@ -0,0 +1,75 @@
+'''
+Created on Oct 18, 2026
+'''
+import unittest
+from patgen.dictionary import Dictionary
+from patgen.layer import Layer
+from patgen.margins import Margins
+from patgen.matcher import PatternMatcher, PatternTable
+from patgen.patternset import PatternSet
+from patgen.project import Project
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+
+
+class TestMatcher(unittest.TestCase):
+    
+    def test_levels(self):
+        
+        matcher = PatternMatcher({'hy': {2: 1}, 'phen': {0: 1, 3: 2}, 'en': {1: 3}})
+        
+        self.assertEqual(matcher.levels('hyphen', Margins(1,1)), {2: 1, 5: 3})
+        self.assertEqual(matcher.hyphenate('hyphen', Margins(1,1)), {2, 5})
+        self.assertEqual(matcher.hyphenate('hyphen', Margins(3,1)), {5})
+
+    def test_table(self):
+        
+        table = PatternTable({'hy': {2: 1}, 'phen': {0: 1, 3: 2}, 'en': {1: 3}})
+        
+        self.assertEqual(table['phen'], (1, 0, 0, 2, 0))
+        self.assertEqual(table.levels('hyphen', Margins(1,1)), {2: 1, 5: 3})
+        self.assertEqual(table.hyphenate('hyphen', Margins(3,1)), {5})
+
+    def test_same_as_layers(self):
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        for _ in range(4):
+            project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+
+        for margins in (Margins(1,1), Margins(0,0), Margins(2,2)):
+            for word in project.dictionary.keys():
+                expected = project.patternset.hyphenate_layers(word, margins)
+                self.assertEqual(project.patternset.hyphenate(word, margins), expected)
+                self.assertEqual(project.patternset.hyphenate(word, margins, engine='table'), expected)
+
+        for engine in PatternSet.ENGINES:
+            self.assertEqual(project.patternset.evaluate(project.dictionary, project.margins, engine=engine),
+                             (project.missed, project.false))
+
+    def test_rebuild(self):
+        
+        pset = PatternSet()
+        pset.append(Layer(Range(1, 3), None, False))
+        pset[0].update({'ab': {1}})
+        
+        self.assertEqual(pset.hyphenate('abc', Margins(1,1)), {1})
+
+        self.assertEqual(pset.hyphenate('abc', Margins(1,1), engine='table'), {1})
+
+        pset[0]['bc'] = {1}
+        self.assertEqual(pset.hyphenate('abc', Margins(1,1)), {1, 2})
+        self.assertEqual(pset.hyphenate('abc', Margins(1,1), engine='table'), {1, 2})
+
+        pset.append(Layer(Range(1, 3), None, True))
+        pset[1].update({'c': {0}})
+        self.assertEqual(pset.hyphenate('abc', Margins(1,1)), {1})
+
+        del pset[1]
+        self.assertEqual(pset.hyphenate('abc', Margins(1,1)), {1, 2})
+
+
+    def test_unknown_engine(self):
+        
+        with self.assertRaises(ValueError):
+            PatternSet().hyphenate('abc', Margins(1,1), engine='magic')
@@ -0,0 +1,117 @@
+'''
+Created on Oct 18, 2026
+'''
+import os
+import shutil
+import tempfile
+import unittest
+from patgen.dictionary import Dictionary
+from patgen.compact_dictionary import CompactDictionary
+from patgen.layer import Layer
+from patgen.margins import Margins
+from patgen.ngram_index import NgramIndex
+from patgen.project import Project
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+
+
+class TestNgramIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_occurrences(self):
+        
+        dictionary = Dictionary.from_string('''
+        mike
+        like
+        ''')
+        
+        index = NgramIndex.build(dictionary, Margins(1,1), 3)
+        
+        self.assertEqual(set(index.occurrences('ike')), {(0, 2), (1, 2)})
+        self.assertEqual(set(index.occurrences('.m')), {(0, 0)})
+        self.assertEqual(set(index.occurrences('mike')), set())
+
+    def test_save_load(self):
+        
+        dictionary = Dictionary.from_string(DICTIONARY)
+        index = NgramIndex.build(dictionary, Margins(1,1), 3)
+
+        filename = os.path.join(self.tmpdir, 'index')
+        index.save(filename)
+        loaded = NgramIndex.load(filename)
+        
+        self.assertEqual(len(loaded), len(index))
+        self.assertEqual(list(loaded.occurrences('um.')), list(index.occurrences('um.')))
+        self.assertTrue(loaded.is_valid(dictionary, Margins(1,1)))
+        self.assertFalse(loaded.is_valid(dictionary, Margins(2,2)))
+        self.assertFalse(loaded.is_valid(Dictionary.from_string('lorem'), Margins(1,1)))
+
+    def test_training(self):
+
+        rng = Range.parse('1-3')
+        selector = Selector.parse('1:1:1')
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        indexed = Project(Dictionary.from_string(DICTIONARY))
+        indexed.build_index(3)
+
+        for _ in range(3):
+            project.train_new_layer(rng, selector)
+            indexed.train_new_layer(rng, selector)
+        
+        self.assertEqual(list(indexed.patternset.pattern_strings()), list(project.patternset.pattern_strings()))
+        self.assertEqual((indexed.missed, indexed.false), (project.missed, project.false))
+        self.assertEqual(list(indexed.dictionary.records()), list(project.dictionary.records()))
+    
+    def test_incremental_update(self):
+        
+        words = '''
+        2lo-rem
+        ip-s3um
+        do-l-or
+        sit
+        '''
+        for cls in (Dictionary, CompactDictionary):
+            dictionary = cls.from_string(words)
+            dictionary.make_all_missed()
+            full = cls.from_string(words)
+            full.make_all_missed()
+            index = NgramIndex.build(dictionary, Margins(1,1), 3)
+
+            layer = Layer(Range(1, 3), None, False)
+            layer.update({'rem': {0}, 'psu': {1, 2}})
+            
+            self.assertEqual(sorted(index.predict_masks(layer, Margins(1,1)).keys()), [0, 1])  # only lorem and ipsum are visited
+            
+            totals = layer.apply_to_dictionary(False, dictionary, Margins(1,1), index=index)
+            self.assertEqual(layer.apply_to_dictionary(False, full, Margins(1,1)), totals)
+            self.assertEqual(list(dictionary.records()), list(full.records()))
+            
+            self.assertEqual(dictionary.missed['lorem'], set())
+            self.assertEqual(dictionary.false['ipsum'], {3})
+            self.assertEqual(totals, (2, 3))
+            
+            dictionary._totals = None
+            self.assertEqual(dictionary.error_totals(), totals)
+
+    def test_project_sidecar(self):
+
+        filename = os.path.join(self.tmpdir, 'project')
+        project = Project(Dictionary.from_string(DICTIONARY))
+        project.build_index(2)
+        project.save(filename)
+        project.save_index(filename)
+        
+        project = Project.load(filename)
+        self.assertTrue(project.load_index(filename))
+        self.assertEqual(project.index.maxlen, 2)
+
+        other = Project(Dictionary.from_string('lo-rem'))
+        self.assertFalse(other.load_index(filename))
+        self.assertIsNone(other.index)
@@ -0,0 +1,65 @@
+'''
+Created on Oct 18, 2026
+'''
+import os
+import tempfile
+import unittest
+from patgen.dictionary import Dictionary
+from patgen.layer import Layer
+from patgen.predictions import PredictionCache
+from patgen.project import Project
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+
+
+class TestPredictions(unittest.TestCase):
+    
+    def setUp(self):
+        self.project = Project(Dictionary.from_string(DICTIONARY))
+        for _ in range(3):
+            self.project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+
+    def test_evaluate(self):
+
+        project = self.project
+        cache = PredictionCache.build(project.dictionary, project.margins)
+
+        errors = []
+        totals = cache.evaluate(project.patternset, project.dictionary, project.margins, sinks=[lambda *x: errors.append(x)])
+        self.assertEqual(totals, (project.missed, project.false))
+        self.assertEqual(errors, list(project.patternset.errors(project.dictionary, project.margins)))
+        self.assertEqual(len(cache), 3)
+
+        # replacing a layer only adds its predictions
+        layer = Layer(Range(1, 3), None, True)
+        layer.update({'or': {1}})
+        project.patternset[1] = layer
+        self.assertEqual(cache.evaluate(project.patternset, project.dictionary, project.margins),
+                         project.patternset.evaluate(project.dictionary, project.margins))
+        self.assertEqual(len(cache), 4)
+
+        cache.retain(project.patternset, project.margins)
+        self.assertEqual(len(cache), 3)
+
+    def test_sidecar(self):
+
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            project = self.project
+            self.assertEqual(project.load_predictions(filename), 0)
+            self.assertEqual(project.evaluate(project.dictionary), (project.missed, project.false))
+            project.save_predictions(filename)
+
+            self.assertEqual(project.load_predictions(filename), 3)
+            self.assertEqual(project.evaluate(project.dictionary), (project.missed, project.false))
+
+            # cache is not used for a different dictionary
+            other = Dictionary.from_string('lo-rem')
+            self.assertFalse(project.predictions.is_valid(other, project.margins))
+            self.assertEqual(project.evaluate(other), project.patternset.evaluate(other, project.margins))
+        finally:
+            os.unlink(filename)
+            if os.path.exists(Project.predictions_filename(filename)):
+                os.unlink(Project.predictions_filename(filename))
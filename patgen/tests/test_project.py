@@ -0,0 +1,102 @@
+'''
+Created on Oct 18, 2026
+'''
+import os
+import pickle
+import struct
+import tempfile
+import unittest
+from patgen.compact_dictionary import CompactDictionary
+from patgen.dictionary import Dictionary
+from patgen.project import Project, MAGIC
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+
+
+class TestProject(unittest.TestCase):
+    
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp()
+        os.close(fd)
+
+        self.project = Project(Dictionary.from_string(DICTIONARY))
+        self.project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def test_lazy_load(self):
+
+        self.project.save(self.filename)
+
+        project = Project.load(self.filename)
+        self.assertEqual(project.dictionary_size, len(self.project.dictionary))
+        self.assertEqual((project.missed, project.false), (self.project.missed, self.project.false))
+        self.assertIsNone(project._dictionary)
+        self.assertIsNone(project._patternset)
+
+        self.assertEqual(list(project.patternset.pattern_strings()), list(self.project.patternset.pattern_strings()))
+        self.assertIsNone(project._dictionary)
+
+        self.assertEqual(list(project.dictionary.items()), list(self.project.dictionary.items()))
+        self.assertEqual(project.patternset.evaluate(project.dictionary, project.margins), (project.missed, project.false))
+
+    def test_pickled_project(self):
+
+        with open(self.filename, 'wb') as f:
+            pickle.dump(self.project, f, pickle.HIGHEST_PROTOCOL)
+
+        project = Project.load(self.filename)
+        self.assertEqual(project.dictionary_size, len(self.project.dictionary))
+        self.assertEqual(list(project.patternset.pattern_strings()), list(self.project.patternset.pattern_strings()))
+
+    def test_header_without_num_layers(self):
+
+        p = self.project
+        header = (p.VERSION, p.created, p.modified, p.margins, p.total_hyphens, p.missed, p.false, len(p.dictionary))
+        with open(self.filename, 'wb') as f:  # sectioned format before journal support
+            f.write(MAGIC)
+            for x in (header, p.patternset, p.dictionary):
+                data = pickle.dumps(x, pickle.HIGHEST_PROTOCOL)
+                f.write(struct.pack('<Q', len(data)))
+                f.write(data)
+
+        project = Project.load(self.filename)
+        self.assertEqual(project._num_layers, 1)
+        self.assertEqual(list(project.patternset.pattern_strings()), list(p.patternset.pattern_strings()))
+
+        project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+        project.commit(self.filename, 'train')
+        self.assertEqual(len(Project.load(self.filename).patternset), 2)
+
+    def test_journal(self):
+
+        for cls in (Dictionary, CompactDictionary):
+            project = Project(cls.from_string(DICTIONARY))
+            project.JOURNAL_RATIO = 100  # never consolidate
+            project.save(self.filename)
+
+            states = []
+            for description in ('level 1', 'level 2'):
+                project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+                project.commit(self.filename, description)
+                states.append((list(project.patternset.pattern_strings()), list(project.dictionary.records())))
+
+            project.patternset.compact()
+            project.commit(self.filename, 'compact')
+            states.append((list(project.patternset.pattern_strings()), list(project.dictionary.records())))
+
+            loaded = Project.load(self.filename)
+            self.assertEqual([x[-1] for x in loaded.journal], ['level 1', 'level 2', 'compact'])
+            self.assertEqual((loaded.missed, loaded.false), (project.missed, project.false))
+            self.assertEqual((list(loaded.patternset.pattern_strings()), list(loaded.dictionary.records())), states[-1])
+            self.assertEqual(loaded.dictionary.error_totals(), (project.missed, project.false))
+
+            Project.rollback(self.filename, 2)
+            loaded = Project.load(self.filename)
+            self.assertEqual(len(loaded.journal), 1)
+            self.assertEqual((list(loaded.patternset.pattern_strings()), list(loaded.dictionary.records())), states[0])
+
+            with self.assertRaises(RuntimeError):
+                Project.rollback(self.filename, 2)
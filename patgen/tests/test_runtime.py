@@ -0,0 +1,57 @@
+'''
+Created on Oct 18, 2026
+'''
+import os
+import tempfile
+import unittest
+from patgen.dictionary import Dictionary
+from patgen.project import Project
+from patgen.range import Range
+from patgen.runtime import write_runtime, RuntimePatterns
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+
+
+class TestRuntime(unittest.TestCase):
+    
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def test_patterns(self):
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        for _ in range(2):
+            project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+
+        write_runtime(self.filename, project.patternset.table(), project.margins, [])
+
+        with RuntimePatterns(self.filename) as runtime:
+            self.assertEqual(runtime.margins, tuple(project.margins))
+            for word in list(project.dictionary.keys()) + [u'ёлка', u'x']:
+                self.assertEqual(runtime.levels(word), project.patternset.matcher().levels(word, project.margins))
+                self.assertEqual(runtime.hyphenate(word), project.patternset.hyphenate(word, project.margins))
+
+    def test_exceptions(self):
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+        exceptions = [(word, hyphens) for word, hyphens, _, _ in project.patternset.errors(project.dictionary, project.margins)]
+        self.assertTrue(exceptions)
+
+        write_runtime(self.filename, project.patternset.table(), project.margins, exceptions)
+
+        with RuntimePatterns(self.filename) as runtime:
+            for word, hyphens in project.dictionary.items():
+                self.assertEqual(runtime.hyphenate(word), hyphens)
+
+    def test_not_a_runtime_file(self):
+
+        with open(self.filename, 'wb') as f:
+            f.write(b'\0' * 64)
+
+        with self.assertRaises(RuntimeError):
+            RuntimePatterns(self.filename)
@@ -0,0 +1,91 @@
+'''
+Created on Oct 18, 2026
+'''
+import json
+import unittest
+from patgen.dictionary import Dictionary, format_dictionary_word
+from patgen.project import Project
+from patgen.range import Range
+from patgen.selector import Selector
+from patgen.tests.test_integration import DICTIONARY
+
+try:
+    import asyncio
+    from patgen import server
+except (ImportError, SyntaxError):
+    server = None
+
+
+@unittest.skipIf(server is None, 'asyncio is not available')
+class TestServer(unittest.TestCase):
+    
+    def test_hyphenate(self):
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+        words = list(project.dictionary.keys())
+
+        async def request(port, method, path, body=b''):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(('%s %s HTTP/1.1\r\nContent-Length: %s\r\nConnection: close\r\n\r\n' % (method, path, len(body))).encode('latin-1'))
+            writer.write(body)
+            response = await reader.read()
+            writer.close()
+            head, _, payload = response.partition(b'\r\n\r\n')
+            return head.split(b'\r\n')[0], payload
+
+        async def run():
+            hs = server.HyphenationServer(project.patternset, project.margins, batch_delay=0.01)
+            tcp = await hs.start(port=0)
+            port = tcp.sockets[0].getsockname()[1]
+            try:
+                bodies = [('\n'.join([word, '', ' ' + word]) + '\n').encode('utf-8') for word in words]
+                responses = await asyncio.gather(*[request(port, 'POST', '/hyphenate', body) for body in bodies])
+                stats = await request(port, 'GET', '/stats')
+                missing = await request(port, 'GET', '/nothing')
+            finally:
+                await hs.close()
+            return responses, stats, missing
+
+        loop = asyncio.new_event_loop()
+        try:
+            responses, stats, missing = loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+        for word, (status, payload) in zip(words, responses):
+            self.assertEqual(status, b'HTTP/1.1 200 OK')
+            line = format_dictionary_word(word, project.patternset.hyphenate(word, project.margins)) + '\n'
+            self.assertEqual(payload.decode('utf-8'), line * 2)
+
+        report = json.loads(stats[1].decode('utf-8'))
+        self.assertEqual(report['requests'], len(words))
+        self.assertEqual(report['words'], 2 * len(words))
+        self.assertTrue(1 <= report['batches'] <= len(words))  # concurrent requests are batched, how many depends on timing
+        self.assertEqual(missing[0], b'HTTP/1.1 404 Not Found')
+
+    def test_batching(self):
+
+        project = Project(Dictionary.from_string(DICTIONARY))
+        project.train_new_layer(Range(1, 3), Selector(1, 1, 1))
+        words = list(project.dictionary.keys())
+
+        # batch is closed as soon as it has all words, the long delay only guards against a slow machine
+        hs = server.HyphenationServer(project.patternset, project.margins, batch_size=len(words), batch_delay=60)
+
+        async def run():
+            await hs.start(port=0)
+            try:
+                return await asyncio.gather(*[hs.hyphenate([word]) for word in words])
+            finally:
+                await hs.close()
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+        self.assertEqual(hs.stats.batches, 1)
+        for word, result in zip(words, results):
+            self.assertEqual(result, [format_dictionary_word(word, project.patternset.hyphenate(word, project.margins))])
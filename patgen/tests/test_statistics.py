@@ -0,0 +1,80 @@
+'''
+Created on Oct 18, 2026
+'''
+import unittest
+from patgen.dictionary import Dictionary
+from patgen.margins import Margins
+from patgen.selector import Selector
+from patgen import statistics
+
+
+class TestStatistics(unittest.TestCase):
+    
+    def test_all_positions(self):
+        
+        dictionary = Dictionary.from_string('''
+        hy-phe-2n-a-tion
+        wo.rd
+        ''')
+        
+        for margins in (Margins(1,1), Margins(2,2)):
+            for inhibiting in (False, True):
+                stats = dictionary.collect_pattern_statistics(inhibiting, 3, margins)
+                for position in range(4):
+                    expected = dictionary.generate_pattern_statistics(inhibiting, 3, position, margins)
+                    self.assertEqual(stats.position(position), expected)
+
+    def test_select(self):
+        
+        dictionary = Dictionary.from_string('''
+        word
+        ''')
+        dictionary.make_all_missed()
+
+        stats = dictionary.collect_pattern_statistics(False, 3, Margins(1,1))
+        self.assertEqual(list(stats.items()), [('.wo', 2, 0, 1), ('.wo', 3, 0, 1), 
+                                               ('ord', 0, 0, 1), ('ord', 1, 0, 1), ('ord', 2, 0, 1), 
+                                               ('rd.', 0, 0, 1), ('rd.', 1, 0, 1), 
+                                               ('wor', 1, 0, 1), ('wor', 2, 0, 1), ('wor', 3, 0, 1)])
+        
+        patterns = stats.select(Selector(1, 0, 0))
+        self.assertEqual(dict(patterns), {'.wo': {2, 3}, 'ord': {0, 1, 2}, 'rd.': {0, 1}, 'wor': {1, 2, 3}})
+
+    def test_sharded(self):
+        
+        dictionary = Dictionary.from_string('''
+        hy-phe-2n-a-tion
+        wo.rd
+        3pa*t-tern
+        ''')
+
+        for jobs in (1, 2):
+            for inhibiting in (False, True):
+                stats = dictionary.collect_pattern_statistics(inhibiting, 2, Margins(1,1))
+                sharded = dictionary.collect_pattern_statistics(inhibiting, 2, Margins(1,1), shards=2, jobs=jobs)
+                self.assertEqual(list(sharded.items()), list(stats.items()))
+
+    @unittest.skipIf(statistics.numpy_backend is None, 'NumPy is not installed')
+    def test_numpy_backend(self):
+        
+        dictionary = Dictionary.from_string('''
+        hy-phe-2n-a-tion
+        wo.rd
+        3pa*t-tern
+        ''')
+        
+        try:
+            for margins in (Margins(1,1), Margins(2,3)):
+                for inhibiting in (False, True):
+                    for patlen in range(1, 6):
+                        statistics.set_backend('python')
+                        expected = list(dictionary.collect_pattern_statistics(inhibiting, patlen, margins).items())
+                        statistics.set_backend('numpy')
+                        stats = list(dictionary.collect_pattern_statistics(inhibiting, patlen, margins).items())
+                        self.assertEqual(stats, expected)
+        finally:
+            statistics.set_backend('python')
+
+    def test_unknown_backend(self):
+        
+        self.assertRaises(ValueError, statistics.set_backend, 'fortran')
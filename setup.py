@@ -31,6 +31,10 @@ setup(
 
     install_requires=[],
 
+    extras_require={
+        'numpy': ['numpy'],
+    },
+
     entry_points={
         'console_scripts': [
             'pypatgen=patgen.main:main',